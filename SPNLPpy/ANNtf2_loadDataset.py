@@ -140,8 +140,16 @@ from numpy import genfromtxt
 #required for ANNtf2_loadDataset loadDatasetType4 only:
 import re
 from nltk import tokenize
-import spacy
-spacyWordVectorGenerator = spacy.load('en_core_web_md')	#spacy.load('en_core_web_lg')
+import multiprocessing
+import functools
+import itertools
+loadDatasetType4NumberOfProcesses = 1	#number of processes used for sentence segmentation/word tokenisation (1: serial)
+loadDatasetType4ChunkSize = 16	#number of articles per process pool task
+loadDatasetType4WindowSize = 64	#number of process pool tasks (chunks) per window (bounds memory of streamed datasets)
+import SPNLPpy_spacyModelRegistry	#spacy model is loaded on first use (shared with SPNLPpy_syntacticalGraph)
+spacyWordVectorGeneratorRequiredComponentList = []	#word vectors are retrieved from the model vocabulary; no pipeline components are required
+getWordVectorUseVocabularyLookup = True	#retrieve (non-contextual) word vectors directly from spacy model vocabulary vector table (bulk lookup; no pipeline execution)
+import SPNLPpy_wordVectorLibrary	#if(SPNLPpy_wordVectorLibrary.useWordVectorLibraryMemoryMap): vocabulary vector table is memory mapped (spacy model is not loaded)
 
 import ANNtf2_globalDefs
 import ANNtf2_operations
@@ -247,7 +255,10 @@ def loadtxt(filename, delimiter=',', classColumnFirst=True, numeriseClassColumn=
 	return data
 
 
+iter_loadtxtChunkSize = 65536	#number of lines parsed per chunk
+
 def iter_loadtxt(filename, delimiter=',', skiprows=0, dtype=float, normaliseRowLengthWithPad=False, normaliseRowLengthWithPadLimit=False, padString='0', maxRowLength=100, minRowLength=0):
+	#single pass; lines are parsed in chunks of iter_loadtxtChunkSize into preallocated (geometrically grown) typed arrays
 	
 	absFilePath = createFileAbsPath(filename)
 	
@@ -255,64 +266,79 @@ def iter_loadtxt(filename, delimiter=',', skiprows=0, dtype=float, normaliseRowL
 	if(normaliseRowLengthWithPad):
 		normaliseRowLengthWithPadLimitDisgard = True	#disgard longer sentences completely
 		iter_loadtxt.maxNumberOfItemsPerRow = 0
+		iter_loadtxt.minNumberOfItemsPerRow = 0
 		if(normaliseRowLengthWithPadLimit):
 			iter_loadtxt.maxNumberOfItemsPerRow = maxRowLength
 			iter_loadtxt.minNumberOfItemsPerRow = minRowLength
-		else:
-			with open(absFilePath, 'r') as infile:
-				for _ in range(skiprows):
-					next(infile)
-				for line in infile:
-					line = line.rstrip().split(delimiter)
-					numberOfItems = len(line)
-					if(numberOfItems > iter_loadtxt.maxNumberOfItemsPerRow):
-						iter_loadtxt.maxNumberOfItemsPerRow = numberOfItems
-		print("iter_loadtxt.maxNumberOfItemsPerRow = ", iter_loadtxt.maxNumberOfItemsPerRow)
 	
-	if(storeRowLengths):
-		num_lines = 0
-		with open(absFilePath, 'r') as infile:
-			for line in f:
-        			num_lines += 1		
-		rowLengthsArray = np.zeros(num_lines, dtype=int)
-		with open(absFilePath, 'r') as infile:
-			for count, line in enumerate(f):
-				line = line.rstrip().split(delimiter)
-				rowLengthsArray[count] = len(line)
-														
-	def iter_func():
-		with open(absFilePath, 'r') as infile:
-			for _ in range(skiprows):
-				next(infile)
-			for line in infile:
+	itemsArray = np.empty(iter_loadtxtChunkSize, dtype=dtype)	#flattened items of all retained rows
+	numberOfItems = 0
+	rowLengthsArray = np.empty(iter_loadtxtChunkSize, dtype=int)	#number of items of each retained row
+	numberOfRows = 0
+	maxNumberOfItemsPerRow = 0	#all rows (normaliseRowLengthWithPad and !normaliseRowLengthWithPadLimit)
+	lastRowLength = 0
+	
+	with open(absFilePath, 'r') as infile:
+		for _ in range(skiprows):
+			next(infile)
+		lineChunk = list(itertools.islice(infile, iter_loadtxtChunkSize))
+		while(len(lineChunk) > 0):
+			chunkItemList = []
+			chunkRowLengthList = []
+			for line in lineChunk:
 				line = line.rstrip().split(delimiter)
+				lineLength = len(line)
+				maxNumberOfItemsPerRow = max(maxNumberOfItemsPerRow, lineLength)
 				
 				passSentenceLengthReq = True
-				if(normaliseRowLengthWithPadLimitDisgard):
-					if(len(line) > iter_loadtxt.maxNumberOfItemsPerRow):
+				if(normaliseRowLengthWithPadLimitDisgard and normaliseRowLengthWithPadLimit):
+					if(lineLength > iter_loadtxt.maxNumberOfItemsPerRow):
 						passSentenceLengthReq = False
-					if(len(line) < iter_loadtxt.minNumberOfItemsPerRow):
+					if(lineLength < iter_loadtxt.minNumberOfItemsPerRow):
 						passSentenceLengthReq = False
 				
 				if(passSentenceLengthReq):
-					if(normaliseRowLengthWithPad):
-						template = [padString] * iter_loadtxt.maxNumberOfItemsPerRow
-						lineCropped = line[:iter_loadtxt.maxNumberOfItemsPerRow]
-						template[:len(lineCropped)] = lineCropped
-						#print("len(template) = ", len(template))
-						line = template
+					chunkItemList.extend(line)
+					chunkRowLengthList.append(lineLength)
 					
-					for item in line:
-						yield dtype(item)
-						
-		iter_loadtxt.rowlength = len(line)
-
-	data = np.fromiter(iter_func(), dtype=dtype)
-	data = data.reshape((-1, iter_loadtxt.rowlength))
+			chunkItemsArray = np.array(chunkItemList, dtype=dtype)	#vectorised string to number conversion (equivalent to dtype(item))
+			itemsArray = growArray(itemsArray, numberOfItems+len(chunkItemsArray))
+			itemsArray[numberOfItems:numberOfItems+len(chunkItemsArray)] = chunkItemsArray
+			numberOfItems += len(chunkItemsArray)
+			rowLengthsArray = growArray(rowLengthsArray, numberOfRows+len(chunkRowLengthList))
+			rowLengthsArray[numberOfRows:numberOfRows+len(chunkRowLengthList)] = chunkRowLengthList
+			numberOfRows += len(chunkRowLengthList)
+			if(len(chunkRowLengthList) > 0):
+				lastRowLength = chunkRowLengthList[-1]
+			lineChunk = list(itertools.islice(infile, iter_loadtxtChunkSize))
+	
+	itemsArray = itemsArray[0:numberOfItems]
+	rowLengthsArray = rowLengthsArray[0:numberOfRows]
+	
+	if(normaliseRowLengthWithPad):
+		if(not normaliseRowLengthWithPadLimit):
+			iter_loadtxt.maxNumberOfItemsPerRow = maxNumberOfItemsPerRow
+		print("iter_loadtxt.maxNumberOfItemsPerRow = ", iter_loadtxt.maxNumberOfItemsPerRow)
+		iter_loadtxt.rowlength = iter_loadtxt.maxNumberOfItemsPerRow
+		data = np.full((numberOfRows, iter_loadtxt.rowlength), np.array(padString, dtype=dtype), dtype=dtype)
+		itemMask = (np.arange(iter_loadtxt.rowlength) < rowLengthsArray[:, np.newaxis])	#retained rows are never longer than iter_loadtxt.rowlength
+		data[itemMask] = itemsArray	#row major order
+	else:
+		iter_loadtxt.rowlength = lastRowLength
+		data = itemsArray.reshape((-1, iter_loadtxt.rowlength))
+	
 	if(storeRowLengths):
 		return data, rowLengthsArray
 	else:
 		return data
+
+def growArray(array, requiredSize):
+	#geometrically grow array (along first dimension) to at least requiredSize
+	if(requiredSize > len(array)):
+		newArray = np.empty((max(requiredSize, len(array)*2),) + array.shape[1:], dtype=array.dtype)
+		newArray[0:len(array)] = array
+		array = newArray
+	return array
 	
 def hotEncode(y, maxY):
 	yHotEncoded = np.zeros(maxY)
@@ -794,7 +820,6 @@ def loadDatasetType4(datasetFileNameX, limitSentenceLengths, limitSentenceLength
 	f = open(absFilePath)
 	text = f.read()	#f.readlines()
 	
-	articles = []
 	if(splitTextDatasetByWikiTags):
 		articleDelimiter = "ARTICLEDELIMITER"
 		text = text.replace("</doc>\n","")
@@ -806,46 +831,14 @@ def loadDatasetType4(datasetFileNameX, limitSentenceLengths, limitSentenceLength
 		articlesText = []
 		articlesText.append(text)
 		
-	foundValidSentences = False
+	articlesParagraphsText = [article.split('\n\n') for article in articlesText]
+	articles = list(generateDatasetType4ArticlesSentences(articlesParagraphsText, limitSentenceLengths, limitSentenceLengthsSize, NLPsequentialInputTypeTrainWordVectors, NLPsequentialInputTypeTokeniseWords))
 	
-	for articleIndex, article in enumerate(articlesText):
-		#print("\tarticleIndex = ", articleIndex)
-		paragraphsText = article.split('\n\n')
-		paragraphs = []
-		for paragraphIndex, paragraph in enumerate(paragraphsText):
-			#print("\t\tparagraphIndex = ", paragraphIndex)
-			sentencesText = tokenize.sent_tokenize(paragraph)
-			sentences = []
-			for sentenceIndex, sentence in enumerate(sentencesText):
-				#print("\t\t\tsentenceIndex = ", sentenceIndex)
-				sentence = sentence.strip()	#required to remove new lines from sent_tokenize output
-				wordsText = tokenize.word_tokenize(sentence)
-				sentenceLengthCheck = True
-				if(limitSentenceLengths):
-					if(len(wordsText) > limitSentenceLengthsSize):
-						sentenceLengthCheck = False			
-				if(sentenceLengthCheck):
-					foundValidSentences = True
-					if(NLPsequentialInputTypeTokeniseWords):
-						if(NLPsequentialInputTypeTrainWordVectors):
-							words = []
-							for wordIndex, word in enumerate(wordsText):
-								#print("\t\t\t\twordIndex = ", wordIndex)
-								charactersText = list(word)
-								characters = []
-								for characterIndex, character in enumerate(charactersText):
-									#print("\t\t\t\t\tcharacterIndex = ", characterIndex)
-									characters.append(character)	
-								words.append(characters)
-							sentence = words
-							sentences.append(sentence)
-						else:
-							sentences.append(wordsText)
-					else:
-						#print("sentence = ", sentence)
-						sentences.append(sentence)
-			paragraphs.append(sentences)
-		articles.append(paragraphs)
+	foundValidSentences = False
+	for paragraphs in articles:
+		for sentences in paragraphs:
+			if(len(sentences) > 0):
+				foundValidSentences = True
 		
 	if(not foundValidSentences):
 		print("loadDatasetType4 error: !foundValidSentences - require dataset with at least 2 sentences of size < limitSentenceLengthsSize; for test/train split")
@@ -855,6 +848,106 @@ def loadDatasetType4(datasetFileNameX, limitSentenceLengths, limitSentenceLength
 		
 	return articles
 
+#limitSentenceLengths: eliminate smaller sentences from dataset (do not crop them)
+def loadDatasetType4Stream(datasetFileNameX, limitSentenceLengths, limitSentenceLengthsSize, NLPsequentialInputTypeTrainWordVectors, NLPsequentialInputTypeTokeniseWords=True):
+	#generator (streaming equivalent of loadDatasetType4); scans dataset file line by line and yields (articleIndex, paragraphIndex, sentence) tuples in file order
+	
+	splitTextDatasetByWikiTags = True
+	
+	absFilePath = createFileAbsPath(datasetFileNameX)
+	
+	articlesParagraphsText = readDatasetType4ArticlesParagraphs(absFilePath, splitTextDatasetByWikiTags)	#generator
+	
+	foundValidSentences = False
+	for articleIndex, paragraphs in enumerate(generateDatasetType4ArticlesSentences(articlesParagraphsText, limitSentenceLengths, limitSentenceLengthsSize, NLPsequentialInputTypeTrainWordVectors, NLPsequentialInputTypeTokeniseWords)):
+		#articleIndex 0 contains any text preceding the first <doc> tag (consistent with loadDatasetType4)
+		for paragraphIndex, sentences in enumerate(paragraphs):
+			for sentence in sentences:
+				foundValidSentences = True
+				yield articleIndex, paragraphIndex, sentence
+	
+	if(not foundValidSentences):
+		print("loadDatasetType4Stream error: !foundValidSentences - require dataset with at least 2 sentences of size < limitSentenceLengthsSize; for test/train split")
+		exit(0)
+
+def readDatasetType4ArticlesParagraphs(absFilePath, splitTextDatasetByWikiTags):
+	#generator; scans dataset file line by line and yields a list of paragraph strings for every article
+	paragraphs = []
+	paragraphLines = []
+	with open(absFilePath) as f:
+		for line in f:
+			line = line.rstrip('\n')
+			if(splitTextDatasetByWikiTags and (line == "</doc>")):
+				pass
+			elif(splitTextDatasetByWikiTags and re.match('\<doc id', line)):
+				paragraphs.append("\n".join(paragraphLines))
+				paragraphLines = []
+				yield paragraphs
+				paragraphs = []
+			elif(line == ""):
+				paragraphs.append("\n".join(paragraphLines))
+				paragraphLines = []
+			else:
+				paragraphLines.append(line)
+	paragraphs.append("\n".join(paragraphLines))
+	yield paragraphs
+
+def generateDatasetType4ArticlesSentences(articlesParagraphsText, limitSentenceLengths, limitSentenceLengthsSize, NLPsequentialInputTypeTrainWordVectors, NLPsequentialInputTypeTokeniseWords):
+	#generator; yields list of paragraphs (lists of valid sentences) for every article, in original article order
+	#articlesParagraphsText: list or generator of articles (lists of paragraph strings)
+	generateArticleSentences = functools.partial(generateDatasetType4ArticleSentences, limitSentenceLengths=limitSentenceLengths, limitSentenceLengthsSize=limitSentenceLengthsSize, NLPsequentialInputTypeTrainWordVectors=NLPsequentialInputTypeTrainWordVectors, NLPsequentialInputTypeTokeniseWords=NLPsequentialInputTypeTokeniseWords)
+	if(loadDatasetType4NumberOfProcesses > 1):
+		articlesParagraphsTextIterator = iter(articlesParagraphsText)
+		with multiprocessing.Pool(processes=loadDatasetType4NumberOfProcesses) as pool:
+			articlesParagraphsTextWindow = list(itertools.islice(articlesParagraphsTextIterator, loadDatasetType4ChunkSize*loadDatasetType4WindowSize))
+			while(len(articlesParagraphsTextWindow) > 0):
+				for paragraphs in pool.imap(generateArticleSentences, articlesParagraphsTextWindow, chunksize=loadDatasetType4ChunkSize):	#imap preserves article order
+					yield paragraphs
+				articlesParagraphsTextWindow = list(itertools.islice(articlesParagraphsTextIterator, loadDatasetType4ChunkSize*loadDatasetType4WindowSize))
+	else:
+		for articleParagraphsText in articlesParagraphsText:
+			yield generateArticleSentences(articleParagraphsText)
+
+def generateDatasetType4ArticleSentences(articleParagraphsText, limitSentenceLengths, limitSentenceLengthsSize, NLPsequentialInputTypeTrainWordVectors, NLPsequentialInputTypeTokeniseWords):
+	#process pool worker (must be defined at module level); returns list of paragraphs (lists of valid sentences)
+	paragraphs = []
+	for paragraphIndex, paragraph in enumerate(articleParagraphsText):
+		#print("\t\tparagraphIndex = ", paragraphIndex)
+		sentences = list(generateDatasetType4ParagraphSentences(paragraph, limitSentenceLengths, limitSentenceLengthsSize, NLPsequentialInputTypeTrainWordVectors, NLPsequentialInputTypeTokeniseWords))
+		paragraphs.append(sentences)
+	return paragraphs
+
+def generateDatasetType4ParagraphSentences(paragraph, limitSentenceLengths, limitSentenceLengthsSize, NLPsequentialInputTypeTrainWordVectors, NLPsequentialInputTypeTokeniseWords):
+	#generator; yields valid sentences of paragraph (sentences exceeding limitSentenceLengthsSize are eliminated)
+	sentencesText = tokenize.sent_tokenize(paragraph)
+	for sentenceIndex, sentence in enumerate(sentencesText):
+		#print("\t\t\tsentenceIndex = ", sentenceIndex)
+		sentence = sentence.strip()	#required to remove new lines from sent_tokenize output
+		wordsText = tokenize.word_tokenize(sentence)
+		sentenceLengthCheck = True
+		if(limitSentenceLengths):
+			if(len(wordsText) > limitSentenceLengthsSize):
+				sentenceLengthCheck = False			
+		if(sentenceLengthCheck):
+			if(NLPsequentialInputTypeTokeniseWords):
+				if(NLPsequentialInputTypeTrainWordVectors):
+					words = []
+					for wordIndex, word in enumerate(wordsText):
+						#print("\t\t\t\twordIndex = ", wordIndex)
+						charactersText = list(word)
+						characters = []
+						for characterIndex, character in enumerate(charactersText):
+							#print("\t\t\t\t\tcharacterIndex = ", characterIndex)
+							characters.append(character)	
+						words.append(characters)
+					sentence = words
+					yield sentence
+				else:
+					yield wordsText
+			else:
+				#print("sentence = ", sentence)
+				yield sentence
+
 #code moved from AEANNtf_main.py/AEANNtf_algorithmSequentialInput.py | SPNLPpy_normalisation.py;
 #should be defined as preprocessor defs (non-variable);
 NLPsequentialInputTypeCharacters = 0
@@ -866,10 +959,12 @@ NLPsequentialInputTypes = ["characters", "words", "sentences", "paragraphs"]
 NLPsequentialInputNumberOfTypes = len(NLPsequentialInputTypes)
 wordVectorLibraryNumDimensions = 300	#https://spacy.io/models/en#en_core_web_md (300 dimensions)
 					
-def convertArticlesTreeToSentencesWordVectors(articles, limitSentenceLengthsSize, numberOfFeaturesPerWord=wordVectorLibraryNumDimensions):
+convertArticlesTreeToSentencesWordVectorsChunkSize = 1024	#number of sentences per bulk word vector lookup
+
+def convertArticlesTreeToSentencesWordVectors(articles, limitSentenceLengthsSize, numberOfFeaturesPerWord=wordVectorLibraryNumDimensions, dataType=float):
 
 	paddingTagIndex = paddingTagIndexVectorisedInput
-	dataType = float 	#mandatory
+	#dataType = float 	#default
 	padExamples = True	#mandatory
 	cropExamples = True	#mandatory
 	minimumSentenceLength = 0
@@ -877,16 +972,28 @@ def convertArticlesTreeToSentencesWordVectors(articles, limitSentenceLengthsSize
 	#print("limitSentenceLengthsSize = ", limitSentenceLengthsSize)
 		
 	articles = flattenNestedListToSentences(articles)
-	sentenceListWordVectors = []
-	for sentenceIndex, sentence in enumerate(articles):	#sentence: is a list of words (strings)
-		#print("sentenceIndex = ", sentenceIndex)
-		inputVectorList = generateWordVectorInputList(sentence, wordVectorLibraryNumDimensions)	#numberSequentialInputs x inputVecDimensions	#inputVectorList: is a list of numpy vectors
-		inputVectorList = cropAndPadWordVectorInputList(inputVectorList, maximumSentenceLength, paddingTagIndex, numberOfFeaturesPerWord, dataType)
-		inputVectorNP = np.asarray(inputVectorList)
-		inputVectorNP = inputVectorNP.flatten()	#default data format used by *ANNtf 
-		#print("inputVectorNP.shape = ", inputVectorNP.shape)
-		sentenceListWordVectors.append(inputVectorNP)
-	all_Xnormalised = np.asarray(sentenceListWordVectors)
+	if(not isinstance(articles, list)):
+		articles = list(articles)	#loadDatasetType4Stream: dataset size is required for preallocation
+	if(maximumSentenceLength is None):
+		maximumSentenceLength = max([len(sentence) for sentence in articles], default=0)
+	
+	#preallocate dataset (single copy); sentences are cropped/padded in place;
+	datasetNumExamples = len(articles)
+	all_XnormalisedWords = np.full((datasetNumExamples, maximumSentenceLength, numberOfFeaturesPerWord), paddingTagIndex, dtype=dataType)
+	for chunkIndex in range(0, datasetNumExamples, convertArticlesTreeToSentencesWordVectorsChunkSize):
+		chunkWordList = []
+		chunkSentenceIndexList = []
+		chunkWordIndexList = []
+		for sentenceIndex in range(chunkIndex, min(chunkIndex+convertArticlesTreeToSentencesWordVectorsChunkSize, datasetNumExamples)):
+			sentence = articles[sentenceIndex]	#sentence: is a list of words (strings)
+			sentenceCropped = sentence[0:maximumSentenceLength]
+			chunkWordList.extend(sentenceCropped)
+			chunkSentenceIndexList.extend([sentenceIndex]*len(sentenceCropped))
+			chunkWordIndexList.extend(range(len(sentenceCropped)))
+		if(len(chunkWordList) > 0):
+			chunkWordVectorMatrix = generateWordVectorInputMatrix(chunkWordList, wordVectorLibraryNumDimensions)	#bulk lookup
+			all_XnormalisedWords[np.array(chunkSentenceIndexList), np.array(chunkWordIndexList)] = chunkWordVectorMatrix
+	all_Xnormalised = all_XnormalisedWords.reshape((datasetNumExamples, maximumSentenceLength*numberOfFeaturesPerWord))	#view	#default data format used by *ANNtf 
 	#print("all_Xnormalised = ", all_Xnormalised)
 	print("all_Xnormalised.shape = ", all_Xnormalised.shape)
 	
@@ -903,14 +1010,17 @@ def convertArticlesTreeToSentencesWordVectors(articles, limitSentenceLengthsSize
 	all_Y = np.ones(datasetNumExamples, dtype=dataType)
 	all_Ynormalised = all_Y
 	
-	train_x = all_Xnormalised[0:datasetNumExamplesTrain, :]
-	test_x = all_Xnormalised[-datasetNumExamplesTest:, :]
+	train_x = all_Xnormalised[0:datasetNumExamplesTrain, :]	#view
+	test_x = all_Xnormalised[-datasetNumExamplesTest:, :]	#view
 	train_y = all_Ynormalised[0:datasetNumExamplesTrain]	#None
 	test_y = all_Ynormalised[-datasetNumExamplesTest:]	#None
 		
 	return numberOfFeaturesPerWord, paddingTagIndex, datasetNumFeatures, datasetNumClasses, datasetNumExamples, train_x, train_y, test_x, test_y
 
 def flattenNestedListToSentences(articles):
+	#articles: nested list (loadDatasetType4) or generator of (articleIndex, paragraphIndex, sentence) tuples (loadDatasetType4Stream)
+	if(not isinstance(articles, list)):
+		return flattenStreamToSentences(articles)	#generator
 	articlesFlattened = []
 	nestedList = articles
 	for NLPsequentialInputTypeIndex in range(NLPsequentialInputTypeArticles, NLPsequentialInputTypeSentences, -1):
@@ -925,18 +1035,34 @@ def flattenNestedListToSentences(articles):
 	#print("articles = ", articles)
 	#print("listDimensions(articlesFlattened) = ", listDimensions(articlesFlattened))
 	return articlesFlattened
+
+def flattenStreamToSentences(articlesStream):
+	for articleIndex, paragraphIndex, sentence in articlesStream:
+		yield sentence
 			
 def generateWordVectorInputList(textContentList, NLPsequentialInputDimensions):
-	inputVectorList = []
-	for word in textContentList:
-		#print("word = ", word)
-		wordVectorList = getWordVector(word)
-		wordVector = np.array(wordVectorList)
-		#print("word = ", word, " wordVector = ", wordVector)
-		#print("wordVector.shape = ", wordVector.shape)
-		inputVectorList.append(wordVector)
+	if(getWordVectorUseVocabularyLookup):
+		inputVectorMatrix = getWordVectorMatrix(textContentList)
+		inputVectorList = list(inputVectorMatrix)	#list of inputVectorMatrix row views
+	else:
+		inputVectorList = []
+		for word in textContentList:
+			#print("word = ", word)
+			wordVectorList = getWordVector(word)
+			wordVector = np.array(wordVectorList)
+			#print("word = ", word, " wordVector = ", wordVector)
+			#print("wordVector.shape = ", wordVector.shape)
+			inputVectorList.append(wordVector)
 	return inputVectorList
 
+def generateWordVectorInputMatrix(textContentList, NLPsequentialInputDimensions):
+	#returns numpy array of shape (len(textContentList), NLPsequentialInputDimensions)
+	if(getWordVectorUseVocabularyLookup):
+		inputVectorMatrix = getWordVectorMatrix(textContentList)
+	else:
+		inputVectorMatrix = np.array(generateWordVectorInputList(textContentList, NLPsequentialInputDimensions))
+	return inputVectorMatrix
+
 def cropAndPadWordVectorInputList(inputVectorList, maximumSentenceLength, paddingTagIndex, numberOfFeaturesPerWord, dataType):
 	inputVectorListCroppedPadded = []
 	
@@ -966,10 +1092,41 @@ def generateRandomisedIndexArray(indexFirst, indexLast, arraySize=None):
 	return fileIndexRandomArray
 	
 def getWordVector(word):
-	return getWordVectorInContext(word, 0)
+	if(getWordVectorUseVocabularyLookup):
+		wordVector = getWordVectorMatrix([word])[0]
+	else:
+		wordVector = getWordVectorInContext(word, 0)
+	return wordVector
+
+def getWordVectorMatrix(wordList):
+	#bulk lookup of (non-contextual) word vectors in spacy model vocabulary vector table; one lookup per unique word
+	#returns numpy array of shape (len(wordList), wordVectorLibraryNumDimensions); out of vocabulary words are assigned zero vectors (equivalent to token.vector)
+	if(SPNLPpy_wordVectorLibrary.useWordVectorLibraryMemoryMap):
+		return SPNLPpy_wordVectorLibrary.getWordVectorLibraryMatrix(wordList)
+		
+	spacyWordVectorGenerator = SPNLPpy_spacyModelRegistry.getSpacyModel()
+	vectors = spacyWordVectorGenerator.vocab.vectors
+	
+	uniqueWordDict = {}	#dict indexed by word, every entry is the unique word index
+	wordIndexList = []
+	for word in wordList:
+		if word not in uniqueWordDict:
+			uniqueWordDict[word] = len(uniqueWordDict)
+		wordIndexList.append(uniqueWordDict[word])
+	
+	uniqueWordVectorMatrix = np.zeros((len(uniqueWordDict), vectors.shape[1]), dtype=np.float32)
+	if(len(uniqueWordDict) > 0):
+		uniqueWordKeys = np.array([spacyWordVectorGenerator.vocab.strings[word] for word in uniqueWordDict], dtype=np.uint64)
+		uniqueWordRows = vectors.find(keys=uniqueWordKeys)	#-1: out of vocabulary
+		uniqueWordInVocabulary = (uniqueWordRows >= 0)
+		uniqueWordVectorMatrix[uniqueWordInVocabulary] = np.asarray(vectors.data)[uniqueWordRows[uniqueWordInVocabulary]]
+	wordVectorMatrix = uniqueWordVectorMatrix[np.array(wordIndexList, dtype=np.int64)]
+	return wordVectorMatrix
 
 def getWordVectorInContext(sentence, wordIndex):
-	doc = spacyWordVectorGenerator(sentence)
+	spacyWordVectorGenerator = SPNLPpy_spacyModelRegistry.getSpacyModel()
+	disabledComponentList = SPNLPpy_spacyModelRegistry.getSpacyModelDisabledComponents(spacyWordVectorGenerator, spacyWordVectorGeneratorRequiredComponentList)
+	doc = spacyWordVectorGenerator(sentence, disable=disabledComponentList)
 	wordVector = doc[wordIndex].vector	#cpu: type numpy
 	return wordVector
 	
@@ -45,3 +45,5 @@ else:
 	drawSyntacticalGraphNodeColours = False
 	
 performReferenceResolution = True
+
+useParseCache = False	#optional	#persistent (on disk) cache of spacy/benepar parse results (SPNLPpy_syntacticalGraphParseCache); skips neural parsers for previously parsed sentences (eg during metric calibration)
@@ -69,6 +69,12 @@ NLPsequentialInputTypeTrainWordVectors = False
 wordVectorLibraryNumDimensions = 300	#https://spacy.io/models/en#en_core_web_md (300 dimensions)
 
 trainMultipleFiles = False	#can set to true for production (after testing algorithm)
+prefetchDataset = False	#optional	#load (and segment) next dataset file in a background process while current dataset file is processed	#streamed datasets are materialised by the background process
+prefetchDatasetQueueDepth = 1	#maximum number of dataset files loaded in advance
+if(prefetchDataset):
+	import concurrent.futures
+	import itertools
+	from collections import deque
 numEpochs = 1
 if(numEpochs > 1):
 	randomiseFileIndexParse = True
@@ -86,6 +92,7 @@ if(debugUseSmallSequentialInputDataset):
 else:
 	dataset4FileNameXstart = "Xdataset4Part"
 xmlDatasetFileNameEnd = ".xml"
+loadDatasetType4Streaming = True	#yield sentences incrementally while scanning dataset file (rather than loading entire articles tree into memory)
 def loadDataset(fileIndex, textualDatasetLoadPerformProcessing=True):
 
 	global numberOfFeaturesPerWord
@@ -120,7 +127,10 @@ def loadDataset(fileIndex, textualDatasetLoadPerformProcessing=True):
 		numberOfFeaturesPerWord = None
 		paddingTagIndex = None
 	elif(dataset == "wikiXmlDataset"):
-		articles = ANNtf2_loadDataset.loadDatasetType4(datasetType4FileName, limitSentenceLengths, limitSentenceLengthsSize, NLPsequentialInputTypeTrainWordVectors, NLPsequentialInputTypeTokeniseWords)
+		if(loadDatasetType4Streaming):
+			articles = ANNtf2_loadDataset.loadDatasetType4Stream(datasetType4FileName, limitSentenceLengths, limitSentenceLengthsSize, NLPsequentialInputTypeTrainWordVectors, NLPsequentialInputTypeTokeniseWords)	#generator
+		else:
+			articles = ANNtf2_loadDataset.loadDatasetType4(datasetType4FileName, limitSentenceLengths, limitSentenceLengthsSize, NLPsequentialInputTypeTrainWordVectors, NLPsequentialInputTypeTokeniseWords)
 		if(textualDatasetLoadPerformProcessing):
 			numberOfFeaturesPerWord, paddingTagIndex, datasetNumFeatures, datasetNumClasses, datasetNumExamples, train_x, train_y, test_x, test_y = ANNtf2_loadDataset.convertArticlesTreeToSentencesWordVectors(articles, limitSentenceLengthsSize)
 
@@ -159,20 +169,50 @@ def trainSequentialInput(trainMultipleFiles=False):
 		#trainMultipleFiles code;
 		if(randomiseFileIndexParse):
 			fileIndexShuffledArray = ANNtf2_loadDataset.generateRandomisedIndexArray(fileIndexFirst, fileIndexLast)
+		fileIndexList = []
 		for f in range(minFileIndex, maxFileIndex+1):
 			if(randomiseFileIndexParse):
 				fileIndex = fileIndexShuffledArray[f]
 			else:
 				fileIndex = f
+			fileIndexList.append(fileIndex)
 
-			#SPNLP specific code;
-							
-			articles = loadDataset(fileIndex, textualDatasetLoadPerformProcessing=False)	#do not perform processing of textual dataset during load (word vector extraction)
-								
+		#SPNLP specific code;
+		
+		if(prefetchDataset):
+			articlesList = loadDatasetPrefetch(fileIndexList)	#generator
+		else:
+			articlesList = (loadDataset(fileIndex, textualDatasetLoadPerformProcessing=False) for fileIndex in fileIndexList)	#do not perform processing of textual dataset during load (word vector extraction)
+			
+		for articles in articlesList:
 			#print("articles = ", articles)
 			#print("listDimensions(articles) = ", listDimensions(articles))
 			
 			processingSimple(articles)
+
+def loadDatasetPrefetch(fileIndexList):
+	#generator; yields articles of every dataset file in fileIndexList (in order), while up to prefetchDatasetQueueDepth subsequent dataset files are loaded by a background process
+	#note if ANNtf2_loadDataset.loadDatasetType4NumberOfProcesses > 1, python >= 3.9 is required (process pool workers cannot create child processes in earlier versions)
+	fileIndexIterator = iter(fileIndexList)
+	with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+		articlesFutureQueue = deque()
+		for fileIndex in itertools.islice(fileIndexIterator, prefetchDatasetQueueDepth):
+			articlesFutureQueue.append(executor.submit(loadDatasetArticles, fileIndex))
+		while(len(articlesFutureQueue) > 0):
+			articles = articlesFutureQueue.popleft().result()
+			fileIndex = next(fileIndexIterator, None)
+			if(fileIndex is not None):
+				articlesFutureQueue.append(executor.submit(loadDatasetArticles, fileIndex))	#load next dataset file while current dataset file is processed
+			if(loadDatasetType4Streaming):
+				articles = iter(articles)	#restore (articleIndex, paragraphIndex, sentence) stream format expected by flattenNestedListToSentences
+			yield articles
+
+def loadDatasetArticles(fileIndex):
+	#process pool worker (must be defined at module level)
+	articles = loadDataset(fileIndex, textualDatasetLoadPerformProcessing=False)
+	if(loadDatasetType4Streaming):
+		articles = list(articles)	#generators cannot be transferred between processes
+	return articles
 					
 						
 def processingSimple(articles):
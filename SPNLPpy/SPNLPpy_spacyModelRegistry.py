@@ -0,0 +1,46 @@
+"""SPNLPpy_spacyModelRegistry.py
+
+# Author:
+Richard Bruce Baxter - Copyright (c) 2022-2023 Baxter AI (baxterai.com)
+
+# License:
+MIT License
+
+# Installation:
+see SPNLPpy_main.py
+
+# Usage:
+see SPNLPpy_main.py
+
+# Description:
+SPNLP spacy model registry - shared lazily loaded spacy pipelines
+
+- every spacy model is loaded once (on first use) and shared across modules (SPNLPpy_syntacticalGraph, ANNtf2_loadDataset etc)
+- consumers request only the pipeline components they require; all other components are disabled when the model is called
+
+"""
+
+import spacy
+
+spacyModelNameDefault = 'en_core_web_md'	#'en_core_web_lg'
+
+spacyModelDictionary = {}	#dict indexed by spacy model name, every entry is a loaded spacy Language pipeline
+
+def getSpacyModel(modelName=spacyModelNameDefault):
+	if modelName not in spacyModelDictionary:
+		print("SPNLPpy_spacyModelRegistry: spacy.load ", modelName)
+		spacyModelDictionary[modelName] = spacy.load(modelName)
+	return spacyModelDictionary[modelName]
+
+def isSpacyModelLoaded(modelName=spacyModelNameDefault):
+	return (modelName in spacyModelDictionary)
+
+def getSpacyModelDisabledComponents(spacyModel, requiredComponentList=None):
+	#requiredComponentList: list of pipeline component names required by consumer (None: all components are required)
+	#component names not present in the pipeline are ignored (allows a single list to support both spacy 2 and spacy 3 pipeline component names)
+	disabledComponentList = []
+	if(requiredComponentList is not None):
+		for componentName in spacyModel.pipe_names:
+			if(componentName not in requiredComponentList):
+				disabledComponentList.append(componentName)
+	return disabledComponentList
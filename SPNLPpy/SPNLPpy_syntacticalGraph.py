@@ -22,8 +22,9 @@ SPNLP (or SANI) syntactical tree stucture is generated in a format similar to a
 """
 
 import numpy as np
-import spacy
-spacyWordVectorGenerator = spacy.load('en_core_web_md')	#spacy.load('en_core_web_lg')
+import itertools
+import SPNLPpy_spacyModelRegistry
+import SPNLPpy_wordVectorLibrary
 from SPNLPpy_syntacticalNodeClass import *
 import SPNLPpy_syntacticalGraphOperations
 import SPNLPpy_syntacticalGraphIntermediaryTransformation
@@ -33,7 +34,6 @@ if(constituencyParserType == "constituencyParserWordVector"):
 	import SPNLPpy_syntacticalGraphConstituencyParserWordVectors
 elif(constituencyParserType == "constituencyParserFormal"):
 	import SPNLPpy_syntacticalGraphConstituencyParserFormal	
-	SPNLPpy_syntacticalGraphConstituencyParserFormal.initalise(spacyWordVectorGenerator)
 
 if(dependencyParserType == "dependencyParserWordVector"):
 	if(generateDependencyParseTreeFromConstituencyParseTree):
@@ -43,6 +43,9 @@ if(dependencyParserType == "dependencyParserWordVector"):
 elif(dependencyParserType == "dependencyParserFormal"):
 	import SPNLPpy_syntacticalGraphDependencyParserFormal
 
+if(useParseCache):
+	import SPNLPpy_syntacticalGraphParseCache
+
 if(drawSyntacticalGraph):	
 	if(drawSyntacticalGraphSentence):
 		import SPNLPpy_syntacticalGraphDraw as SPNLPpy_syntacticalGraphDrawSentence
@@ -58,25 +61,42 @@ syntacticalGraphNodeDictionary = {}	#dict indexed by lemma, every entry is a dic
 
 networkHeadNodeList = []
 
+tokeniseSentencesBatch = True	#optional	#tokenise entire sentence list via spacy nlp.pipe (reduces per sentence pipeline overhead)
+if(tokeniseSentencesBatch):
+	tokeniseSentencesBatchSize = 64	#number of sentences per nlp.pipe batch
+	tokeniseSentencesNumberOfProcesses = 1	#nlp.pipe n_process	#CHECKTHIS: n_process > 1 requires pipeline components (eg benepar) to support multiprocessing
+
 def generateSyntacticalGraphNetwork(articles, performIntermediarySyntacticalTransformation, generateSyntacticalGraphNetwork, identifySyntacticalDependencyRelations):
-		
-	for sentenceIndex, sentence in enumerate(articles):
-		generateSyntacticalGraphSentenceString(sentenceIndex, sentence, performIntermediarySyntacticalTransformation, generateSyntacticalGraphNetwork, identifySyntacticalDependencyRelations)		
+
+	setSpacyWordVectorGeneratorRequiredComponents(performIntermediarySyntacticalTransformation, identifySyntacticalDependencyRelations)
 	
+	if(tokeniseSentencesBatch):
+		tokenisedSentenceList = tokeniseSentences(articles)	#generator (docs are returned in original sentence order)
+		for sentenceIndex, tokenisedSentence in enumerate(tokenisedSentenceList):
+			generateSyntacticalGraphSentenceTokenised(sentenceIndex, tokenisedSentence, performIntermediarySyntacticalTransformation, generateSyntacticalGraphNetwork, identifySyntacticalDependencyRelations)
+	else:
+		for sentenceIndex, sentence in enumerate(articles):
+			generateSyntacticalGraphSentenceString(sentenceIndex, sentence, performIntermediarySyntacticalTransformation, generateSyntacticalGraphNetwork, identifySyntacticalDependencyRelations)
+
 	return syntacticalGraphNodeDictionary	#, syntacticalGraphConnectionsDictionary
-	
-def generateSyntacticalGraphSentenceString(sentenceIndex, sentence, performIntermediarySyntacticalTransformation, generateSyntacticalGraphNetwork, identifySyntacticalDependencyRelations):
 
-	print("\n\ngenerateSyntacticalGraphSentenceString: sentenceIndex = ", sentenceIndex, "; ", sentence)
+def generateSyntacticalGraphSentenceString(sentenceIndex, sentence, performIntermediarySyntacticalTransformation, generateSyntacticalGraphNetwork, identifySyntacticalDependencyRelations):
 
+	setSpacyWordVectorGeneratorRequiredComponents(performIntermediarySyntacticalTransformation, identifySyntacticalDependencyRelations)
 	tokenisedSentence = tokeniseSentence(sentence)
+	return generateSyntacticalGraphSentenceTokenised(sentenceIndex, tokenisedSentence, performIntermediarySyntacticalTransformation, generateSyntacticalGraphNetwork, identifySyntacticalDependencyRelations)
+
+def generateSyntacticalGraphSentenceTokenised(sentenceIndex, tokenisedSentence, performIntermediarySyntacticalTransformation, generateSyntacticalGraphNetwork, identifySyntacticalDependencyRelations):
+
+	print("\n\ngenerateSyntacticalGraphSentenceTokenised: sentenceIndex = ", sentenceIndex, "; ", tokenisedSentence.text)
+
 	sentenceLength = len(tokenisedSentence)
 	print("sentenceLength = ", sentenceLength)
 	
 	if(sentenceLength > 1):
 		return generateSyntacticalGraphSentence(sentenceIndex, tokenisedSentence, performIntermediarySyntacticalTransformation, generateSyntacticalGraphNetwork, identifySyntacticalDependencyRelations)
 	else:
-		print("generateSyntacticalGraphSentenceString error: sentenceLength !> 1")
+		print("generateSyntacticalGraphSentenceTokenised error: sentenceLength !> 1")
 		#exit()
 			
 def generateSyntacticalGraphSentence(sentenceIndex, tokenisedSentence, performIntermediarySyntacticalTransformation, generateSyntacticalGraphNetwork, identifySyntacticalDependencyRelations):
@@ -196,10 +216,97 @@ def generateSyntacticalGraphSentence(sentenceIndex, tokenisedSentence, performIn
 	
 #tokenisation:
 
+spacyWordVectorGenerator = None	#shared spacy model (loaded on first use)
+spacyWordVectorGeneratorRequiredComponentList = None	#None: all pipeline components are required
+
+#spacy pipeline components (spacy 2 and spacy 3 names; names absent from the loaded pipeline are ignored);
+spacyComponentListLemma = ["tok2vec", "tagger", "attribute_ruler", "lemmatizer"]	#spacy 2: lemmas are assigned by tagger	#spacy 3: rule based lemmatizer requires POS tags (tagger/attribute_ruler), so posTag (identifyEntityType) is always available
+spacyComponentListDependencyParser = ["tok2vec", "parser"]
+spacyComponentListSentenceSegmentation = ["tok2vec", "parser"]	#doc.sents	#senter is not used; it is disabled by default in spacy 3 pipelines (absent from pipe_names), and enabling it in the shared model (SPNLPpy_spacyModelRegistry) would change doc.sents of consumers that require all components
+spacyComponentListConstituencyParser = ["benepar"]
+	#note ner is not used by SPNLPpy
+
+def setSpacyWordVectorGeneratorRequiredComponents(performIntermediarySyntacticalTransformation, identifySyntacticalDependencyRelations):
+	global spacyWordVectorGeneratorRequiredComponentList
+	spacyWordVectorGeneratorRequiredComponentList = calculateSpacyWordVectorGeneratorRequiredComponents(performIntermediarySyntacticalTransformation, identifySyntacticalDependencyRelations)
+
+def calculateSpacyWordVectorGeneratorRequiredComponents(performIntermediarySyntacticalTransformation, identifySyntacticalDependencyRelations):
+	requiredComponentList = []
+	requiredComponentList.extend(spacyComponentListLemma)	#lemma is required for all syntactical nodes (concept identification); includes posTag components (drawSyntacticalGraphNodeColours/performIntermediarySyntacticalTransformation identifyEntityType)
+	if(constituencyParserType == "constituencyParserFormal"):
+		requiredComponentList.extend(spacyComponentListSentenceSegmentation)
+		requiredComponentList.extend(spacyComponentListConstituencyParser)
+	if(identifySyntacticalDependencyRelations):
+		if(dependencyParserType == "dependencyParserFormal"):
+			requiredComponentList.extend(spacyComponentListDependencyParser)
+	return requiredComponentList
+
+def getSpacyWordVectorGenerator():
+	global spacyWordVectorGenerator
+	if(spacyWordVectorGenerator is None):
+		spacyWordVectorGenerator = SPNLPpy_spacyModelRegistry.getSpacyModel()
+		if(constituencyParserType == "constituencyParserFormal"):
+			SPNLPpy_syntacticalGraphConstituencyParserFormal.initalise(spacyWordVectorGenerator)
+	return spacyWordVectorGenerator
+
 def tokeniseSentence(sentence):
-	tokenList = spacyWordVectorGenerator(sentence)
+	spacyModel = getSpacyWordVectorGenerator()
+	disabledComponentList = SPNLPpy_spacyModelRegistry.getSpacyModelDisabledComponents(spacyModel, spacyWordVectorGeneratorRequiredComponentList)
+	if(useParseCache):
+		pipelineIdentifier = SPNLPpy_syntacticalGraphParseCache.generateParseCachePipelineIdentifier(spacyModel, disabledComponentList)
+		parseCacheKey = SPNLPpy_syntacticalGraphParseCache.generateParseCacheKey(sentence, pipelineIdentifier)
+		tokenList = SPNLPpy_syntacticalGraphParseCache.loadParse(parseCacheKey, spacyModel)
+		if(tokenList is None):
+			tokenList = spacyModel(sentence, disable=disabledComponentList)
+			saveParseCache(parseCacheKey, tokenList)
+	else:
+		tokenList = spacyModel(sentence, disable=disabledComponentList)
 	return tokenList
 
+def tokeniseSentences(sentenceList):
+	#sentenceList: list or generator of sentence strings
+	spacyModel = getSpacyWordVectorGenerator()
+	disabledComponentList = SPNLPpy_spacyModelRegistry.getSpacyModelDisabledComponents(spacyModel, spacyWordVectorGeneratorRequiredComponentList)
+	if(useParseCache):
+		tokenListGenerator = tokeniseSentencesParseCache(spacyModel, disabledComponentList, sentenceList)
+	else:
+		tokenListGenerator = spacyModel.pipe(sentenceList, batch_size=tokeniseSentencesBatchSize, n_process=tokeniseSentencesNumberOfProcesses, disable=disabledComponentList)
+	return tokenListGenerator
+
+def tokeniseSentencesParseCache(spacyModel, disabledComponentList, sentenceList):
+	#only sentences absent from parse cache are passed to nlp.pipe; docs are yielded in original sentence order
+	pipelineIdentifier = SPNLPpy_syntacticalGraphParseCache.generateParseCachePipelineIdentifier(spacyModel, disabledComponentList)
+	sentenceIterator = iter(sentenceList)
+	sentenceBatch = list(itertools.islice(sentenceIterator, tokeniseSentencesBatchSize*tokeniseSentencesNumberOfProcesses))
+	while(len(sentenceBatch) > 0):
+		tokenListBatch = []
+		parseCacheKeyBatch = []
+		parseCacheMissIndexList = []
+		for sentenceBatchIndex, sentence in enumerate(sentenceBatch):
+			parseCacheKey = SPNLPpy_syntacticalGraphParseCache.generateParseCacheKey(sentence, pipelineIdentifier)
+			tokenList = SPNLPpy_syntacticalGraphParseCache.loadParse(parseCacheKey, spacyModel)
+			if(tokenList is None):
+				parseCacheMissIndexList.append(sentenceBatchIndex)
+			tokenListBatch.append(tokenList)
+			parseCacheKeyBatch.append(parseCacheKey)
+		if(len(parseCacheMissIndexList) > 0):
+			sentenceMissList = [sentenceBatch[sentenceBatchIndex] for sentenceBatchIndex in parseCacheMissIndexList]
+			tokenListMissGenerator = spacyModel.pipe(sentenceMissList, batch_size=tokeniseSentencesBatchSize, n_process=tokeniseSentencesNumberOfProcesses, disable=disabledComponentList)
+			for sentenceBatchIndex, tokenList in zip(parseCacheMissIndexList, tokenListMissGenerator):
+				saveParseCache(parseCacheKeyBatch[sentenceBatchIndex], tokenList)
+				tokenListBatch[sentenceBatchIndex] = tokenList
+		for tokenList in tokenListBatch:
+			yield tokenList
+		sentenceBatch = list(itertools.islice(sentenceIterator, tokeniseSentencesBatchSize*tokeniseSentencesNumberOfProcesses))
+
+def saveParseCache(parseCacheKey, tokenList):
+	userDataKeyList = []
+	if(constituencyParserType == "constituencyParserFormal"):
+		SPNLPpy_syntacticalGraphConstituencyParserFormal.getConstituencyTree(tokenList)	#store benepar constituency tree in doc.user_data (serialisable)
+		userDataKeyList.append(SPNLPpy_syntacticalGraphConstituencyParserFormal.constituencyTreeUserDataKey)
+		userDataKeyList.append(SPNLPpy_syntacticalGraphConstituencyParserFormal.constituencyParseStringUserDataKey)
+	SPNLPpy_syntacticalGraphParseCache.saveParse(parseCacheKey, tokenList, userDataKeyList)
+
 def getTokenWord(token):
 	word = token.text
 	return word
@@ -211,7 +318,11 @@ def getTokenLemma(token):
 	return lemma
 		
 def getTokenWordVector(token):
-	wordVector = token.vector	#cpu: type numpy
+	wordVector = None
+	if(SPNLPpy_wordVectorLibrary.useWordVectorLibraryMemoryMap):
+		wordVector = SPNLPpy_wordVectorLibrary.getWordVectorLibraryVector(token.text)	#view of shared (memory mapped) word vector matrix
+	if(wordVector is None):
+		wordVector = token.vector	#cpu: type numpy
 	return wordVector
 
 def getTokenPOStag(token):
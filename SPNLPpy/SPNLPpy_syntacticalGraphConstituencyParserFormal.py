@@ -28,30 +28,53 @@ benepar.download('benepar_en3')	#Berkeley constituency parser
  
 
 def initalise(spacyWordVectorGenerator):
-	if spacy.__version__.startswith('2'):
+	#spacyWordVectorGenerator is shared (SPNLPpy_spacyModelRegistry); only add benepar pipe once
+	if("benepar" in spacyWordVectorGenerator.pipe_names):
+		pass
+	elif spacy.__version__.startswith('2'):
 		spacyWordVectorGenerator.add_pipe(benepar.BeneparComponent("benepar_en3"))
 	else:
 		spacyWordVectorGenerator.add_pipe("benepar", config={"model": "benepar_en3"})
 
 
+constituencyTreeUserDataKey = "SPNLPpyConstituencyTree"	#doc.user_data key
+constituencyParseStringUserDataKey = "SPNLPpyConstituencyParseString"	#doc.user_data key
+
 def generateSyntacticalTreeConstituencyParserFormal(sentenceIndex, tokenisedSentence, sentenceLeafNodeList, sentenceTreeNodeList, syntacticalGraphNodeDictionary):
 
-	constituents = list(tokenisedSentence.sents)[0]
-	print(constituents._.parse_string)
-	graphHeadNode, wCurrentLeafNode = generateSyntacticalTree(constituents, sentenceIndex, sentenceLeafNodeList, sentenceTreeNodeList, syntacticalGraphNodeDictionary, True, 0)	#or constituents
+	constituencyTree, constituencyParseString = getConstituencyTree(tokenisedSentence)
+	print(constituencyParseString)
+	graphHeadNode, wCurrentLeafNode = generateSyntacticalTree(constituencyTree, sentenceIndex, sentenceLeafNodeList, sentenceTreeNodeList, syntacticalGraphNodeDictionary, True, 0)	#or constituents
 
 	return graphHeadNode
 
+def getConstituencyTree(tokenisedSentence):
+	#constituency tree is stored in doc.user_data (independent of benepar internals such that it can be serialised; see SPNLPpy_syntacticalGraphParseCache)
+	if(constituencyTreeUserDataKey not in tokenisedSentence.user_data):
+		constituents = list(tokenisedSentence.sents)[0]
+		tokenisedSentence.user_data[constituencyTreeUserDataKey] = generateConstituencyTree(constituents)
+		tokenisedSentence.user_data[constituencyParseStringUserDataKey] = constituents._.parse_string
+	constituencyTree = tokenisedSentence.user_data[constituencyTreeUserDataKey]
+	constituencyParseString = tokenisedSentence.user_data[constituencyParseStringUserDataKey]
+	return constituencyTree, constituencyParseString
+
+def generateConstituencyTree(constituent):
+	#constituency tree node format: (constituentText, constituentLabel, childConstituentList)
+	childConstituentList = []
+	for childConstituent in list(constituent._.children):
+		childConstituentList.append(generateConstituencyTree(childConstituent))
+	constituencyTreeNode = (constituent.text, constituent._.labels, childConstituentList)	#or constituent.labels
+	return constituencyTreeNode
+
 def generateSyntacticalTree(constituent, sentenceIndex, sentenceLeafNodeList, sentenceTreeNodeList, syntacticalGraphNodeDictionary, isHead, wCurrentLeafNode):
 
-	constituentText = constituent
-	constituentLabel = constituent._.labels	#or constituent.labels
+	constituentText, constituentLabel, childConstituentList = constituent
 	if(SPNLPpy_syntacticalGraphOperations.printVerbose):
 		print("generateSyntacticalTree: constituentText = ", constituentText, ", constituentLabel = ", constituentLabel)
 	
 	currentTime = SPNLPpy_syntacticalGraphOperations.calculateActivationTime(sentenceIndex)
 
-	numberOfChildren = len(list(constituent._.children))
+	numberOfChildren = len(childConstituentList)
 	if(isHead):
 		nodeGraphType = graphNodeTypeHead
 	else:
@@ -81,7 +104,7 @@ def generateSyntacticalTree(constituent, sentenceIndex, sentenceLeafNodeList, se
 		CPwMax = 0
 
 		childNodeList = []
-		for childIndex, childConstituent in enumerate(list(constituent._.children)):
+		for childIndex, childConstituent in enumerate(childConstituentList):
 			childNode, wCurrentLeafNode = generateSyntacticalTree(childConstituent, sentenceIndex, sentenceLeafNodeList, sentenceTreeNodeList, syntacticalGraphNodeDictionary, False, wCurrentLeafNode)
 			childNodeList.append(childNode)
 
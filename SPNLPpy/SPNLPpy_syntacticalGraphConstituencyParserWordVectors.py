@@ -20,12 +20,14 @@ Preconditions: assumes leaf nodes already generated
 """
 
 import numpy as np
+import heapq
 import spacy
 import ANNtf2_loadDataset
 from SPNLPpy_syntacticalNodeClass import *
 import SPNLPpy_syntacticalGraphOperations
 
 calibrateConnectionMetricParameters = True
+connectionMergeHeap = True	#optional	#maintain metrics of adjacent connectivity stack node pairs in a priority queue (only pairs adjacent to a new hidden node are calculated after each merge); merge decisions are identical to exhaustive connectivity stack search
 
 def generateSyntacticalTreeConstituencyParserWordVectors(sentenceIndex, sentenceLeafNodeList, sentenceTreeNodeList, connectivityStackNodeList, syntacticalGraphNodeDictionary):
 
@@ -37,7 +39,29 @@ def generateSyntacticalTreeConstituencyParserWordVectors(sentenceIndex, sentence
 		proximityList = []
 		frequencyList = []	
 		metricList = []
-		
+		connectionMetricParameterLists = (proximityList, frequencyList, recencyList, metricList)
+	else:
+		connectionMetricParameterLists = None
+	
+	if(connectionMergeHeap):
+		graphHeadNode = generateSyntacticalTreeMergeHeap(sentenceIndex, currentTime, sentenceTreeNodeList, connectivityStackNodeList, syntacticalGraphNodeDictionary, connectionMetricParameterLists)
+	else:
+		graphHeadNode = generateSyntacticalTreeMergeStack(sentenceIndex, currentTime, sentenceTreeNodeList, connectivityStackNodeList, syntacticalGraphNodeDictionary, connectionMetricParameterLists)
+			
+	if(calibrateConnectionMetricParameters):
+		proximityMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(proximityList)
+		frequencyMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(frequencyList)
+		recencyMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(recencyList)
+		metricMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(metricList)
+		print("proximityMinMeanMax = ", proximityMinMeanMax)
+		print("frequencyMinMeanMax = ", frequencyMinMeanMax)
+		print("recencyMinMeanMax = ", recencyMinMeanMax)
+		print("metricMinMeanMax = ", metricMinMeanMax)
+			
+	return graphHeadNode
+
+def generateSyntacticalTreeMergeStack(sentenceIndex, currentTime, sentenceTreeNodeList, connectivityStackNodeList, syntacticalGraphNodeDictionary, connectionMetricParameterLists):
+	#exhaustive search of connectivity stack node pairs for every merge
 	headNodeFound = False
 	graphHeadNode = None
 	while not headNodeFound:
@@ -54,12 +78,7 @@ def generateSyntacticalTreeConstituencyParserWordVectors(sentenceIndex, sentence
 					#print("node1.CPwMax = ", node1.CPwMax)
 					#print("node2.CPwMin = ", node2.CPwMin)
 					if(node1.CPwMax+1 == node2.CPwMin):
-						if(SPNLPpy_syntacticalGraphOperations.printVerbose):
-							print("calculateMetricConnection: node1.lemma = ", node1.lemma, ", node2.lemma = ", node2.lemma)
-						proximity = SPNLPpy_syntacticalGraphOperations.calculateProximityConnection(node1.w, node2.w)
-						frequency = SPNLPpy_syntacticalGraphOperations.calculateFrequencyConnection(sentenceTreeNodeList, node1, node2)
-						recency = SPNLPpy_syntacticalGraphOperations.calculateRecencyConnection(sentenceTreeNodeList, node1, node2, currentTime)	#minimise the difference in concept last access recency between left/right node
-						connectionMetric = SPNLPpy_syntacticalGraphOperations.calculateMetricConnection(proximity, frequency, recency)
+						connectionMetric = calculateMetricConnectionNodes(sentenceTreeNodeList, node1, node2, currentTime, connectionMetricParameterLists)
 						if(connectionMetric > SPNLPpy_syntacticalGraphOperations.metricThresholdToCreateConnection):
 							if(connectionMetric > maxConnectionMetric):
 								#print("connectionMetric found")
@@ -67,47 +86,12 @@ def generateSyntacticalTreeConstituencyParserWordVectors(sentenceIndex, sentence
 								maxConnectionMetric = connectionMetric
 								connectionNode1 = node1
 								connectionNode2 = node2
-						
-						if(calibrateConnectionMetricParameters):
-							proximityList.append(proximity)
-							frequencyList.append(frequency)
-							recencyList.append(recency)
-							metricList.append(connectionMetric)
 			
 		if(not connectionFound):
 			print("error connectionFound - check calculateMetricConnection parameters > 0.0, maxConnectionMetric = ", maxConnectionMetric)
 			exit()
 
-		if(SPNLPpy_syntacticalGraphOperations.printVerbose):
-			print("create connection; w1 w2 = ", connectionNode1.w, " ", connectionNode2.w, ", connectionNode1.lemma connectionNode2.lemma = ", connectionNode1.lemma, " ", connectionNode2.lemma, ", metric = ", maxConnectionMetric)
-
-		#CHECKTHIS limitation - infers directionality (source/target) of connection based on w1/w2 word order		
-		connectionDirection = True	#CHECKTHIS: always assume left to right directionality
-
-		#primary vars;
-		word = connectionNode1.word + connectionNode2.word
-		lemma = connectionNode1.lemma + connectionNode2.lemma
-		wordVector = SPNLPpy_syntacticalGraphOperations.getBranchWordVectorFromSourceNodes(connectionNode1, connectionNode2)
-		posTag = None
-		activationTime = SPNLPpy_syntacticalGraphOperations.calculateActivationTime(sentenceIndex)	#mean([connectionNode1.activationTime, connectionNode2.activationTime]) 
-		nodeGraphType = graphNodeTypeBranch
-
-		#sentenceTreeArtificial vars;
-		CPsubgraphSize = connectionNode1.CPsubgraphSize + connectionNode2.CPsubgraphSize + 1
-		conceptWordVector = np.add(connectionNode1.conceptWordVector, connectionNode2.conceptWordVector)
-		conceptTime = connectionNode1.conceptTime + connectionNode2.conceptTime
-		CPtreeLevel = max(connectionNode1.CPtreeLevel, connectionNode2.CPtreeLevel) + 1
-		w = SPNLPpy_syntacticalGraphOperations.mean([connectionNode1.w, connectionNode2.w])
-		CPwMin = min(connectionNode1.CPwMin, connectionNode2.CPwMin)
-		CPwMax = max(connectionNode1.CPwMax, connectionNode2.CPwMax)
-
-		instanceID = SPNLPpy_syntacticalGraphOperations.getNewInstanceID(syntacticalGraphNodeDictionary, lemma)
-		hiddenNode = SyntacticalNode(instanceID, word, lemma, wordVector, posTag, nodeGraphType, currentTime, CPsubgraphSize, conceptWordVector, conceptTime, w, CPwMin, CPwMax, CPtreeLevel, sentenceIndex)
-		SPNLPpy_syntacticalGraphOperations.addInstanceNodeToGraph(syntacticalGraphNodeDictionary, lemma, instanceID, hiddenNode)
-		
-		#connection vars;
-		SPNLPpy_syntacticalGraphOperations.createGraphConnectionWrapper(hiddenNode, connectionNode1, connectionNode2, connectionDirection, addToConnectionsDictionary=False)
-		sentenceTreeNodeList.append(hiddenNode)
+		hiddenNode = createConnection(sentenceIndex, currentTime, sentenceTreeNodeList, syntacticalGraphNodeDictionary, connectionNode1, connectionNode2, maxConnectionMetric)
 		connectivityStackNodeList.remove(connectionNode1)
 		connectivityStackNodeList.remove(connectionNode2)
 		connectivityStackNodeList.append(hiddenNode)
@@ -116,16 +100,129 @@ def generateSyntacticalTreeConstituencyParserWordVectors(sentenceIndex, sentence
 			headNodeFound = True
 			hiddenNode.graphNodeType = graphNodeTypeHead	#reference set delimiter (captures primary subject/action/object of sentence clause)
 			graphHeadNode = hiddenNode
-			
-	if(calibrateConnectionMetricParameters):
-		proximityMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(proximityList)
-		frequencyMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(frequencyList)
-		recencyMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(recencyList)
-		metricMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(metricList)
-		print("proximityMinMeanMax = ", proximityMinMeanMax)
-		print("frequencyMinMeanMax = ", frequencyMinMeanMax)
-		print("recencyMinMeanMax = ", recencyMinMeanMax)
-		print("metricMinMeanMax = ", metricMinMeanMax)
-			
+	
+	return graphHeadNode
+
+def generateSyntacticalTreeMergeHeap(sentenceIndex, currentTime, sentenceTreeNodeList, connectivityStackNodeList, syntacticalGraphNodeDictionary, connectionMetricParameterLists):
+	#connectivity stack is stored as a linked sequence of word index spans (left/right neighbours); adjacent pair metrics are stored in a max heap indexed by (-connectionMetric, connectivity stack position of node1)
+	#heap entries of merged nodes are invalidated lazily (on pop); every adjacent pair metric is calculated once	
+	#equal metrics are resolved by connectivity stack order of node1 (consistent with generateSyntacticalTreeMergeStack)
+	stackPositionDict = {}	#dict indexed by node, every entry is connectivity stack position (nodes are appended to connectivity stack in creation order)
+	rightNeighbourDict = {}	#dict indexed by node, every entry is node with CPwMin == node.CPwMax+1
+	leftNeighbourDict = {}	#dict indexed by node, every entry is node with CPwMax+1 == node.CPwMin
+	wMinDict = {}
+	for stackPosition, node in enumerate(connectivityStackNodeList):
+		stackPositionDict[node] = stackPosition
+		wMinDict[node.CPwMin] = node
+	connectionHeap = []
+	for node1 in connectivityStackNodeList:
+		if(node1.CPwMax+1 in wMinDict):
+			node2 = wMinDict[node1.CPwMax+1]
+			rightNeighbourDict[node1] = node2
+			leftNeighbourDict[node2] = node1
+			addConnectionToMergeHeap(connectionHeap, stackPositionDict, sentenceTreeNodeList, node1, node2, currentTime, connectionMetricParameterLists)
+	nextStackPosition = len(connectivityStackNodeList)
+	
+	graphHeadNode = None
+	maxConnectionMetric = 0.0
+	numberOfStackNodes = len(connectivityStackNodeList)
+	while(numberOfStackNodes > 1):
+		connectionFound = False
+		maxConnectionMetric = 0.0
+		while(not connectionFound and len(connectionHeap) > 0):
+			negativeConnectionMetric, _, _, connectionNode1, connectionNode2 = heapq.heappop(connectionHeap)
+			if((connectionNode1 in stackPositionDict) and (connectionNode2 in stackPositionDict)):	#else pair is invalid (merged)
+				maxConnectionMetric = -negativeConnectionMetric
+				if((maxConnectionMetric > SPNLPpy_syntacticalGraphOperations.metricThresholdToCreateConnection) and (maxConnectionMetric > 0.0)):
+					connectionFound = True
+				else:
+					break	#maxConnectionMetric is the metric of the best remaining connection
+		if(not connectionFound):
+			print("error connectionFound - check calculateMetricConnection parameters > 0.0, maxConnectionMetric = ", maxConnectionMetric)
+			exit()
+		
+		hiddenNode = createConnection(sentenceIndex, currentTime, sentenceTreeNodeList, syntacticalGraphNodeDictionary, connectionNode1, connectionNode2, maxConnectionMetric)
+		del stackPositionDict[connectionNode1]
+		del stackPositionDict[connectionNode2]
+		stackPositionDict[hiddenNode] = nextStackPosition
+		nextStackPosition += 1
+		numberOfStackNodes -= 1
+		
+		leftNode = leftNeighbourDict.pop(connectionNode1, None)
+		rightNode = rightNeighbourDict.pop(connectionNode2, None)
+		rightNeighbourDict.pop(connectionNode1, None)
+		leftNeighbourDict.pop(connectionNode2, None)
+		if(leftNode is not None):
+			rightNeighbourDict[leftNode] = hiddenNode
+			leftNeighbourDict[hiddenNode] = leftNode
+			addConnectionToMergeHeap(connectionHeap, stackPositionDict, sentenceTreeNodeList, leftNode, hiddenNode, currentTime, connectionMetricParameterLists)
+		if(rightNode is not None):
+			rightNeighbourDict[hiddenNode] = rightNode
+			leftNeighbourDict[rightNode] = hiddenNode
+			addConnectionToMergeHeap(connectionHeap, stackPositionDict, sentenceTreeNodeList, hiddenNode, rightNode, currentTime, connectionMetricParameterLists)
+		
+		if(numberOfStackNodes == 1):
+			hiddenNode.graphNodeType = graphNodeTypeHead	#reference set delimiter (captures primary subject/action/object of sentence clause)
+			graphHeadNode = hiddenNode
+	
+	if(graphHeadNode is None):
+		print("error connectionFound - check calculateMetricConnection parameters > 0.0, maxConnectionMetric = ", maxConnectionMetric)
+		exit()
+	
+	connectivityStackNodeList.clear()
+	connectivityStackNodeList.append(graphHeadNode)
+	
 	return graphHeadNode
 
+def addConnectionToMergeHeap(connectionHeap, stackPositionDict, sentenceTreeNodeList, node1, node2, currentTime, connectionMetricParameterLists):
+	connectionMetric = calculateMetricConnectionNodes(sentenceTreeNodeList, node1, node2, currentTime, connectionMetricParameterLists)
+	heapq.heappush(connectionHeap, (-connectionMetric, stackPositionDict[node1], stackPositionDict[node2], node1, node2))	#node1 stack position is unique for valid entries
+
+def calculateMetricConnectionNodes(sentenceTreeNodeList, node1, node2, currentTime, connectionMetricParameterLists):
+	if(SPNLPpy_syntacticalGraphOperations.printVerbose):
+		print("calculateMetricConnection: node1.lemma = ", node1.lemma, ", node2.lemma = ", node2.lemma)
+	proximity = SPNLPpy_syntacticalGraphOperations.calculateProximityConnection(node1.w, node2.w)
+	frequency = SPNLPpy_syntacticalGraphOperations.calculateFrequencyConnection(sentenceTreeNodeList, node1, node2)
+	recency = SPNLPpy_syntacticalGraphOperations.calculateRecencyConnection(sentenceTreeNodeList, node1, node2, currentTime)	#minimise the difference in concept last access recency between left/right node
+	connectionMetric = SPNLPpy_syntacticalGraphOperations.calculateMetricConnection(proximity, frequency, recency)
+	if(calibrateConnectionMetricParameters):
+		proximityList, frequencyList, recencyList, metricList = connectionMetricParameterLists
+		proximityList.append(proximity)
+		frequencyList.append(frequency)
+		recencyList.append(recency)
+		metricList.append(connectionMetric)
+	return connectionMetric
+
+def createConnection(sentenceIndex, currentTime, sentenceTreeNodeList, syntacticalGraphNodeDictionary, connectionNode1, connectionNode2, maxConnectionMetric):
+	if(SPNLPpy_syntacticalGraphOperations.printVerbose):
+		print("create connection; w1 w2 = ", connectionNode1.w, " ", connectionNode2.w, ", connectionNode1.lemma connectionNode2.lemma = ", connectionNode1.lemma, " ", connectionNode2.lemma, ", metric = ", maxConnectionMetric)
+
+	#CHECKTHIS limitation - infers directionality (source/target) of connection based on w1/w2 word order		
+	connectionDirection = True	#CHECKTHIS: always assume left to right directionality
+
+	#primary vars;
+	word = connectionNode1.word + connectionNode2.word
+	lemma = connectionNode1.lemma + connectionNode2.lemma
+	wordVector = SPNLPpy_syntacticalGraphOperations.getBranchWordVectorFromSourceNodes(connectionNode1, connectionNode2)
+	posTag = None
+	activationTime = SPNLPpy_syntacticalGraphOperations.calculateActivationTime(sentenceIndex)	#mean([connectionNode1.activationTime, connectionNode2.activationTime]) 
+	nodeGraphType = graphNodeTypeBranch
+
+	#sentenceTreeArtificial vars;
+	CPsubgraphSize = connectionNode1.CPsubgraphSize + connectionNode2.CPsubgraphSize + 1
+	conceptWordVector = np.add(connectionNode1.conceptWordVector, connectionNode2.conceptWordVector)
+	conceptTime = connectionNode1.conceptTime + connectionNode2.conceptTime
+	CPtreeLevel = max(connectionNode1.CPtreeLevel, connectionNode2.CPtreeLevel) + 1
+	w = SPNLPpy_syntacticalGraphOperations.mean([connectionNode1.w, connectionNode2.w])
+	CPwMin = min(connectionNode1.CPwMin, connectionNode2.CPwMin)
+	CPwMax = max(connectionNode1.CPwMax, connectionNode2.CPwMax)
+
+	instanceID = SPNLPpy_syntacticalGraphOperations.getNewInstanceID(syntacticalGraphNodeDictionary, lemma)
+	hiddenNode = SyntacticalNode(instanceID, word, lemma, wordVector, posTag, nodeGraphType, currentTime, CPsubgraphSize, conceptWordVector, conceptTime, w, CPwMin, CPwMax, CPtreeLevel, sentenceIndex)
+	SPNLPpy_syntacticalGraphOperations.addInstanceNodeToGraph(syntacticalGraphNodeDictionary, lemma, instanceID, hiddenNode)
+	
+	#connection vars;
+	SPNLPpy_syntacticalGraphOperations.createGraphConnectionWrapper(hiddenNode, connectionNode1, connectionNode2, connectionDirection, addToConnectionsDictionary=False)
+	sentenceTreeNodeList.append(hiddenNode)
+	
+	return hiddenNode
@@ -22,6 +22,7 @@ Preconditions: assumes leaf nodes already generated
 import numpy as np
 import spacy
 from SPNLPpy_syntacticalNodeClass import *
+import SPNLPpy_syntacticalGraphOperations
 
 dependencyTreeRootNodeName = "ROOT"
 
@@ -43,9 +44,9 @@ def generateSyntacticalTreeDependencyParserFormal(sentenceIndex, tokenisedSenten
 		else:
 			tokenGovernor = tokenDependent.head
 			leafNodeGovernor = sentenceLeafNodeList[tokenGovernor.i]
-			leafNodeDependent.DPgovernorList.append(leafNodeGovernor)
-			leafNodeGovernor.DPdependentList.append(leafNodeDependent)
-			leafNodeDependent.DPdependencyRelationLabelList.append(dependencyRelationLabel)
+			addConnectionToNodeGovernors(leafNodeDependent, leafNodeGovernor)
+			addConnectionToNodeDependents(leafNodeGovernor, leafNodeDependent)
+			addDependencyRelationLabelToNode(leafNodeDependent, dependencyRelationLabel)
 
 	
 	if(graphHeadNode is None):
@@ -57,17 +58,5 @@ def generateSyntacticalTreeDependencyParserFormal(sentenceIndex, tokenisedSenten
 	return graphHeadNode
 
 def calculateNodeTreeLevelSentence(syntacticalGraphNode):	
-	treeLevel = calculateNodeTreeLevel(syntacticalGraphNode, 0)
-	#print("treeLevel = ", treeLevel)
-	syntacticalGraphNode.DPtreeLevel = treeLevel
-	for sourceNode in syntacticalGraphNode.DPdependentList:
-		calculateNodeTreeLevelSentence(sourceNode)
-
-def calculateNodeTreeLevel(syntacticalGraphNode, treeLevel):	
-	maxTreeLevelBranch = treeLevel
-	for sourceNode in syntacticalGraphNode.DPdependentList:
-		treeLevelTemp = calculateNodeTreeLevel(sourceNode, treeLevel+1)
-		if(treeLevelTemp > maxTreeLevelBranch):
-			maxTreeLevelBranch = treeLevelTemp
-	return maxTreeLevelBranch
+	SPNLPpy_syntacticalGraphOperations.calculateNodeTreeLevelSentenceDP(syntacticalGraphNode)	#single pass
 
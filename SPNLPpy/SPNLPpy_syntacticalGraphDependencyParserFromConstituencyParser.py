@@ -144,24 +144,12 @@ def formDependencyRelations(node, performIntermediarySyntacticalTransformation):
 			adjacentNodeFound, adjacentNode = identifyAdjacentNode(node, targetNode)
 			#print("\t formDependencyRelations: adjacentNode = ", adjacentNode.lemma)
 			if(adjacentNodeFound):
-				node.CPprimaryLeafNode.DPdependentList.append(adjacentNode.CPprimaryLeafNode)	
-				adjacentNode.CPprimaryLeafNode.DPgovernorList.append(node.CPprimaryLeafNode)
+				addConnectionToNodeDependents(node.CPprimaryLeafNode, adjacentNode.CPprimaryLeafNode)
+				addConnectionToNodeGovernors(adjacentNode.CPprimaryLeafNode, node.CPprimaryLeafNode)
 			formDependencyRelations(targetNode, performIntermediarySyntacticalTransformation)
 
 def calculateNodeTreeLevelSentence(syntacticalGraphNode):	
-	treeLevel = calculateNodeTreeLevel(syntacticalGraphNode, 0)
-	#print("treeLevel = ", treeLevel)
-	syntacticalGraphNode.DPtreeLevel = treeLevel
-	for sourceNode in syntacticalGraphNode.DPdependentList:
-		calculateNodeTreeLevelSentence(sourceNode)
-
-def calculateNodeTreeLevel(syntacticalGraphNode, treeLevel):	
-	maxTreeLevelBranch = treeLevel
-	for sourceNode in syntacticalGraphNode.DPdependentList:
-		treeLevelTemp = calculateNodeTreeLevel(sourceNode, treeLevel+1)
-		if(treeLevelTemp > maxTreeLevelBranch):
-			maxTreeLevelBranch = treeLevelTemp
-	return maxTreeLevelBranch
+	SPNLPpy_syntacticalGraphOperations.calculateNodeTreeLevelSentenceDP(syntacticalGraphNode)	#single pass
 
 
 			
@@ -40,7 +40,29 @@ def generateSyntacticalTreeDependencyParserWordVectors(sentenceIndex, sentenceLe
 		proximityList = []
 		frequencyList = []	
 		metricList = []
-		
+		connectionMetricParameterLists = (proximityList, frequencyList, recencyList, metricList)
+	else:
+		connectionMetricParameterLists = None
+	
+	if(SPNLPpy_syntacticalGraphOperations.isCalculateMetricConnectionMatricesSupported()):
+		graphHeadNode = generateSyntacticalTreeMergeMatrix(sentenceIndex, currentTime, sentenceTreeNodeList, connectivityStackNodeList, syntacticalGraphNodeDictionary, connectionMetricParameterLists)
+	else:
+		graphHeadNode = generateSyntacticalTreeMergeStack(sentenceIndex, currentTime, sentenceTreeNodeList, connectivityStackNodeList, syntacticalGraphNodeDictionary, connectionMetricParameterLists)
+			
+	if(calibrateConnectionMetricParameters):
+		proximityMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(proximityList)
+		frequencyMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(frequencyList)
+		recencyMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(recencyList)
+		metricMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(metricList)
+		print("proximityMinMeanMax = ", proximityMinMeanMax)
+		print("frequencyMinMeanMax = ", frequencyMinMeanMax)
+		print("recencyMinMeanMax = ", recencyMinMeanMax)
+		print("metricMinMeanMax = ", metricMinMeanMax)
+			
+	return graphHeadNode
+
+def generateSyntacticalTreeMergeStack(sentenceIndex, currentTime, sentenceTreeNodeList, connectivityStackNodeList, syntacticalGraphNodeDictionary, connectionMetricParameterLists):
+	#calculate connection metrics of connectivity stack node pairs for every merge
 	headNodeFound = False
 	graphHeadNode = None
 	while not headNodeFound:
@@ -57,12 +79,7 @@ def generateSyntacticalTreeDependencyParserWordVectors(sentenceIndex, sentenceLe
 					#print("node1.CPwMax = ", node1.CPwMax)
 					#print("node2.CPwMin = ", node2.CPwMin)
 					if(node1.CPwMax+1 == node2.CPwMin):
-						if(SPNLPpy_syntacticalGraphOperations.printVerbose):
-							print("calculateMetricConnection: node1.lemma = ", node1.lemma, ", node2.lemma = ", node2.lemma)
-						proximity = SPNLPpy_syntacticalGraphOperations.calculateProximityConnection(node1.w, node2.w)
-						frequency = SPNLPpy_syntacticalGraphOperations.calculateFrequencyConnection(sentenceTreeNodeList, node1, node2)
-						recency = SPNLPpy_syntacticalGraphOperations.calculateRecencyConnection(sentenceTreeNodeList, node1, node2, currentTime)	#minimise the difference in concept last access recency between left/right node
-						connectionMetric = SPNLPpy_syntacticalGraphOperations.calculateMetricConnection(proximity, frequency, recency)
+						connectionMetric = calculateMetricConnectionNodes(sentenceTreeNodeList, node1, node2, currentTime, connectionMetricParameterLists)
 						if(connectionMetric > SPNLPpy_syntacticalGraphOperations.metricThresholdToCreateConnection):
 							if(connectionMetric > maxConnectionMetric):
 								#print("connectionMetric found")
@@ -70,64 +87,122 @@ def generateSyntacticalTreeDependencyParserWordVectors(sentenceIndex, sentenceLe
 								maxConnectionMetric = connectionMetric
 								connectionNode1 = node1
 								connectionNode2 = node2
-						
-						if(calibrateConnectionMetricParameters):
-							proximityList.append(proximity)
-							frequencyList.append(frequency)
-							recencyList.append(recency)
-							metricList.append(connectionMetric)
 			
 		if(not connectionFound):
 			print("error connectionFound - check calculateMetricConnection parameters > 0.0, maxConnectionMetric = ", maxConnectionMetric)
 			exit()
 
-		if(SPNLPpy_syntacticalGraphOperations.printVerbose):
-			print("create connection; w1 w2 = ", connectionNode1.w, " ", connectionNode2.w, ", connectionNode1.lemma connectionNode2.lemma = ", connectionNode1.lemma, " ", connectionNode2.lemma, ", metric = ", maxConnectionMetric)
-
-		#CHECKTHIS limitation - infers directionality (source/target) of connection based on w1/w2 word order		
-		connectionDirection = True	#CHECKTHIS: always assume left to right directionality
-
-		#primary vars;
-		word = connectionNode1.word + connectionNode2.word
-		lemma = connectionNode1.lemma + connectionNode2.lemma
-		wordVector = SPNLPpy_syntacticalGraphOperations.getBranchWordVectorFromSourceNodes(connectionNode1, connectionNode2)
-		posTag = None
-		activationTime = SPNLPpy_syntacticalGraphOperations.calculateActivationTime(sentenceIndex)	#mean([connectionNode1.activationTime, connectionNode2.activationTime]) 
-		nodeGraphType = graphNodeTypeBranch
-
-		#sentenceTreeArtificial vars;
-		CPsubgraphSize = connectionNode1.CPsubgraphSize + connectionNode2.CPsubgraphSize + 1
-		conceptWordVector = np.add(connectionNode1.conceptWordVector, connectionNode2.conceptWordVector)
-		conceptTime = connectionNode1.conceptTime + connectionNode2.conceptTime
-		CPtreeLevel = max(connectionNode1.CPtreeLevel, connectionNode2.CPtreeLevel) + 1
-		w = SPNLPpy_syntacticalGraphOperations.mean([connectionNode1.w, connectionNode2.w])
-		CPwMin = min(connectionNode1.CPwMin, connectionNode2.CPwMin)
-		CPwMax = max(connectionNode1.CPwMax, connectionNode2.CPwMax)
-
-		instanceID = SPNLPpy_syntacticalGraphOperations.getNewInstanceID(syntacticalGraphNodeDictionary, lemma)
-		hiddenNode = SyntacticalNode(instanceID, word, lemma, wordVector, posTag, nodeGraphType, currentTime, CPsubgraphSize, conceptWordVector, conceptTime, w, CPwMin, CPwMax, CPtreeLevel, sentenceIndex)
-		SPNLPpy_syntacticalGraphOperations.addInstanceNodeToGraph(syntacticalGraphNodeDictionary, lemma, instanceID, hiddenNode)
+		hiddenNode = createConnection(sentenceIndex, currentTime, sentenceTreeNodeList, syntacticalGraphNodeDictionary, connectionNode1, connectionNode2, maxConnectionMetric)
+		connectivityStackNodeList.remove(connectionNode1)
+		connectivityStackNodeList.remove(connectionNode2)
+		connectivityStackNodeList.append(hiddenNode)
+
+		if(len(connectivityStackNodeList) == 1):
+			headNodeFound = True
+			hiddenNode.graphNodeType = graphNodeTypeHead	#reference set delimiter (captures primary subject/action/object of sentence clause)
+			graphHeadNode = hiddenNode
+	
+	return graphHeadNode
+
+def generateSyntacticalTreeMergeMatrix(sentenceIndex, currentTime, sentenceTreeNodeList, connectivityStackNodeList, syntacticalGraphNodeDictionary, connectionMetricParameterLists):
+	#connection metric matrices (proximity, frequency, recency, metric) are stored in connectivity stack order; rows/columns of merged nodes are deleted and a row/column is appended for every new hidden node
+	#equal metrics are resolved by connectivity stack order (consistent with generateSyntacticalTreeMergeStack)
+	connectionMetricMatrices = SPNLPpy_syntacticalGraphOperations.calculateMetricConnectionMatrix(connectivityStackNodeList, connectivityStackNodeList, currentTime)
+	wMinArray = np.array([node.CPwMin for node in connectivityStackNodeList])
+	wMaxArray = np.array([node.CPwMax for node in connectivityStackNodeList])
+	
+	headNodeFound = False
+	graphHeadNode = None
+	while not headNodeFound:
+		metricMatrix = connectionMetricMatrices[-1]
+		adjacencyMatrix = (wMaxArray[:, np.newaxis]+1 == wMinArray[np.newaxis, :])
+		if(calibrateConnectionMetricParameters):
+			for connectionMetricParameterList, connectionMetricParameterMatrix in zip(connectionMetricParameterLists, connectionMetricMatrices):
+				connectionMetricParameterList.extend(connectionMetricParameterMatrix[adjacencyMatrix].tolist())
 		
-		#connection vars;
-		SPNLPpy_syntacticalGraphOperations.createGraphConnectionWrapper(hiddenNode, connectionNode1, connectionNode2, connectionDirection, addToConnectionsDictionary=False)
-		sentenceTreeNodeList.append(hiddenNode)
+		connectionCandidateMatrix = np.logical_and(adjacencyMatrix, np.logical_and(metricMatrix > SPNLPpy_syntacticalGraphOperations.metricThresholdToCreateConnection, metricMatrix > 0.0))
+		if(not np.any(connectionCandidateMatrix)):
+			maxConnectionMetric = 0.0
+			if(np.any(adjacencyMatrix)):
+				maxConnectionMetric = np.max(metricMatrix[adjacencyMatrix])	#best adjacent connection metric
+			print("error connectionFound - check calculateMetricConnection parameters > 0.0, maxConnectionMetric = ", maxConnectionMetric)
+			exit()
+		node1StackIndex, node2StackIndex = np.unravel_index(np.argmax(np.where(connectionCandidateMatrix, metricMatrix, -np.inf)), metricMatrix.shape)	#first maximum (row major order)
+		maxConnectionMetric = metricMatrix[node1StackIndex, node2StackIndex]
+		connectionNode1 = connectivityStackNodeList[node1StackIndex]
+		connectionNode2 = connectivityStackNodeList[node2StackIndex]
+
+		hiddenNode = createConnection(sentenceIndex, currentTime, sentenceTreeNodeList, syntacticalGraphNodeDictionary, connectionNode1, connectionNode2, maxConnectionMetric)
+		connectionStackIndices = [node1StackIndex, node2StackIndex]
 		connectivityStackNodeList.remove(connectionNode1)
 		connectivityStackNodeList.remove(connectionNode2)
+		if(len(connectivityStackNodeList) > 0):
+			wMinArray = np.append(np.delete(wMinArray, connectionStackIndices), hiddenNode.CPwMin)
+			wMaxArray = np.append(np.delete(wMaxArray, connectionStackIndices), hiddenNode.CPwMax)
+			hiddenNodeMetricMatrices = SPNLPpy_syntacticalGraphOperations.calculateMetricConnectionMatrix([hiddenNode], connectivityStackNodeList, currentTime)	#connection metrics are symmetric
+			connectionMetricMatrices = [appendConnectionMetricMatrixNode(np.delete(np.delete(connectionMetricParameterMatrix, connectionStackIndices, axis=0), connectionStackIndices, axis=1), hiddenNodeMetricMatrix[0]) for connectionMetricParameterMatrix, hiddenNodeMetricMatrix in zip(connectionMetricMatrices, hiddenNodeMetricMatrices)]
 		connectivityStackNodeList.append(hiddenNode)
 
 		if(len(connectivityStackNodeList) == 1):
 			headNodeFound = True
 			hiddenNode.graphNodeType = graphNodeTypeHead	#reference set delimiter (captures primary subject/action/object of sentence clause)
 			graphHeadNode = hiddenNode
-			
-	if(calibrateConnectionMetricParameters):
-		proximityMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(proximityList)
-		frequencyMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(frequencyList)
-		recencyMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(recencyList)
-		metricMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(metricList)
-		print("proximityMinMeanMax = ", proximityMinMeanMax)
-		print("frequencyMinMeanMax = ", frequencyMinMeanMax)
-		print("recencyMinMeanMax = ", recencyMinMeanMax)
-		print("metricMinMeanMax = ", metricMinMeanMax)
-			
+	
 	return graphHeadNode
+
+def appendConnectionMetricMatrixNode(connectionMetricMatrix, nodeConnectionMetricArray):
+	numberOfNodes = connectionMetricMatrix.shape[0]
+	newConnectionMetricMatrix = np.zeros((numberOfNodes+1, numberOfNodes+1), dtype=np.result_type(connectionMetricMatrix, nodeConnectionMetricArray))
+	newConnectionMetricMatrix[0:numberOfNodes, 0:numberOfNodes] = connectionMetricMatrix
+	newConnectionMetricMatrix[numberOfNodes, 0:numberOfNodes] = nodeConnectionMetricArray
+	newConnectionMetricMatrix[0:numberOfNodes, numberOfNodes] = nodeConnectionMetricArray
+	return newConnectionMetricMatrix
+
+def calculateMetricConnectionNodes(sentenceTreeNodeList, node1, node2, currentTime, connectionMetricParameterLists):
+	if(SPNLPpy_syntacticalGraphOperations.printVerbose):
+		print("calculateMetricConnection: node1.lemma = ", node1.lemma, ", node2.lemma = ", node2.lemma)
+	proximity = SPNLPpy_syntacticalGraphOperations.calculateProximityConnection(node1.w, node2.w)
+	frequency = SPNLPpy_syntacticalGraphOperations.calculateFrequencyConnection(sentenceTreeNodeList, node1, node2)
+	recency = SPNLPpy_syntacticalGraphOperations.calculateRecencyConnection(sentenceTreeNodeList, node1, node2, currentTime)	#minimise the difference in concept last access recency between left/right node
+	connectionMetric = SPNLPpy_syntacticalGraphOperations.calculateMetricConnection(proximity, frequency, recency)
+	if(calibrateConnectionMetricParameters):
+		proximityList, frequencyList, recencyList, metricList = connectionMetricParameterLists
+		proximityList.append(proximity)
+		frequencyList.append(frequency)
+		recencyList.append(recency)
+		metricList.append(connectionMetric)
+	return connectionMetric
+
+def createConnection(sentenceIndex, currentTime, sentenceTreeNodeList, syntacticalGraphNodeDictionary, connectionNode1, connectionNode2, maxConnectionMetric):
+	if(SPNLPpy_syntacticalGraphOperations.printVerbose):
+		print("create connection; w1 w2 = ", connectionNode1.w, " ", connectionNode2.w, ", connectionNode1.lemma connectionNode2.lemma = ", connectionNode1.lemma, " ", connectionNode2.lemma, ", metric = ", maxConnectionMetric)
+
+	#CHECKTHIS limitation - infers directionality (source/target) of connection based on w1/w2 word order		
+	connectionDirection = True	#CHECKTHIS: always assume left to right directionality
+
+	#primary vars;
+	word = connectionNode1.word + connectionNode2.word
+	lemma = connectionNode1.lemma + connectionNode2.lemma
+	wordVector = SPNLPpy_syntacticalGraphOperations.getBranchWordVectorFromSourceNodes(connectionNode1, connectionNode2)
+	posTag = None
+	activationTime = SPNLPpy_syntacticalGraphOperations.calculateActivationTime(sentenceIndex)	#mean([connectionNode1.activationTime, connectionNode2.activationTime]) 
+	nodeGraphType = graphNodeTypeBranch
+
+	#sentenceTreeArtificial vars;
+	CPsubgraphSize = connectionNode1.CPsubgraphSize + connectionNode2.CPsubgraphSize + 1
+	conceptWordVector = np.add(connectionNode1.conceptWordVector, connectionNode2.conceptWordVector)
+	conceptTime = connectionNode1.conceptTime + connectionNode2.conceptTime
+	CPtreeLevel = max(connectionNode1.CPtreeLevel, connectionNode2.CPtreeLevel) + 1
+	w = SPNLPpy_syntacticalGraphOperations.mean([connectionNode1.w, connectionNode2.w])
+	CPwMin = min(connectionNode1.CPwMin, connectionNode2.CPwMin)
+	CPwMax = max(connectionNode1.CPwMax, connectionNode2.CPwMax)
+
+	instanceID = SPNLPpy_syntacticalGraphOperations.getNewInstanceID(syntacticalGraphNodeDictionary, lemma)
+	hiddenNode = SyntacticalNode(instanceID, word, lemma, wordVector, posTag, nodeGraphType, currentTime, CPsubgraphSize, conceptWordVector, conceptTime, w, CPwMin, CPwMax, CPtreeLevel, sentenceIndex)
+	SPNLPpy_syntacticalGraphOperations.addInstanceNodeToGraph(syntacticalGraphNodeDictionary, lemma, instanceID, hiddenNode)
+	
+	#connection vars;
+	SPNLPpy_syntacticalGraphOperations.createGraphConnectionWrapper(hiddenNode, connectionNode1, connectionNode2, connectionDirection, addToConnectionsDictionary=False)
+	sentenceTreeNodeList.append(hiddenNode)
+	
+	return hiddenNode
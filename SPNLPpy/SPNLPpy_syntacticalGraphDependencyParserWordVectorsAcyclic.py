@@ -34,7 +34,8 @@ connectionNode1ToNode2 = True	#should not affect performance
 
 def generateSyntacticalTreeDependencyParserWordVectorsAcyclic(sentenceIndex, sentenceLeafNodeList, sentenceTreeNodeList, connectivityStackNodeList, syntacticalGraphNodeDictionary):
 		
-	SPNLPpy_syntacticalGraphOperations.setParserType(syntacticalGraphTypeAcyclic)
+	useDependencyParseTree = True
+	SPNLPpy_syntacticalGraphOperations.setParserType(useDependencyParseTree)
 	
 	currentTime = SPNLPpy_syntacticalGraphOperations.calculateActivationTime(sentenceIndex)
 
@@ -44,7 +45,30 @@ def generateSyntacticalTreeDependencyParserWordVectorsAcyclic(sentenceIndex, sen
 		proximityList = []
 		frequencyList = []	
 		metricList = []
+		connectionMetricParameterLists = (proximityList, frequencyList, recencyList, metricList)
+	else:
+		connectionMetricParameterLists = None
+	
+	if(SPNLPpy_syntacticalGraphOperations.isCalculateMetricConnectionMatricesSupported()):
+		graphHeadNode = generateSyntacticalTreeAcyclicMatrix(sentenceLeafNodeList, sentenceTreeNodeList, connectivityStackNodeList, currentTime, connectionMetricParameterLists)
+	else:
+		graphHeadNode = generateSyntacticalTreeAcyclicStack(sentenceLeafNodeList, sentenceTreeNodeList, connectivityStackNodeList, currentTime, connectionMetricParameterLists)
 		
+	if(calibrateConnectionMetricParameters):
+		proximityMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(proximityList)
+		frequencyMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(frequencyList)
+		recencyMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(recencyList)
+		metricMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(metricList)
+		print("proximityMinMeanMax = ", proximityMinMeanMax)
+		print("frequencyMinMeanMax = ", frequencyMinMeanMax)
+		print("recencyMinMeanMax = ", recencyMinMeanMax)
+		print("metricMinMeanMax = ", metricMinMeanMax)
+			
+	return graphHeadNode
+
+def generateSyntacticalTreeAcyclicStack(sentenceLeafNodeList, sentenceTreeNodeList, connectivityStackNodeList, currentTime, connectionMetricParameterLists):
+	#calculate connection metrics of connectivity stack node pairs for every connection
+	acyclicGraphComponents = AcyclicGraphComponents(connectivityStackNodeList)
 	headNodeFound = False
 	graphHeadNode = None
 	while not headNodeFound:
@@ -68,7 +92,7 @@ def generateSyntacticalTreeDependencyParserWordVectorsAcyclic(sentenceIndex, sen
 					if(connectionMetric > SPNLPpy_syntacticalGraphOperations.metricThresholdToCreateConnection):
 						if(connectionMetric > maxConnectionMetric):
 							#if(not connectionExists(node1, node2)):	#redundant
-							if(not traceGraphIsCyclicWrapper(node1, node2)):
+							if(not acyclicGraphComponents.isConnected(node1, node2)):	#O(1) cyclic test
 								if(printVerbose):
 									print("\tconnectionMetric found")
 								connectionFound = True
@@ -77,6 +101,7 @@ def generateSyntacticalTreeDependencyParserWordVectorsAcyclic(sentenceIndex, sen
 								connectionNode2 = node2
 
 					if(calibrateConnectionMetricParameters):
+						proximityList, frequencyList, recencyList, metricList = connectionMetricParameterLists
 						proximityList.append(proximity)
 						frequencyList.append(frequency)
 						recencyList.append(recency)
@@ -86,68 +111,113 @@ def generateSyntacticalTreeDependencyParserWordVectorsAcyclic(sentenceIndex, sen
 			print("generateSyntacticalTreeDependencyParserWordVectorsAcyclic: error connectionFound - check calculateMetricConnection parameters > 0.0, maxConnectionMetric = ", maxConnectionMetric)
 			exit()
 
-		if(printVerbose):
-			print("create connection; w1 w2 = ", connectionNode1.w, " ", connectionNode2.w, ", connectionNode1.lemma connectionNode2.lemma = ", connectionNode1.lemma, " ", connectionNode2.lemma, ", metric = ", maxConnectionMetric)
-		
-		if(connectionNode1ToNode2):
-			connectionNode1Temp = connectionNode1
-			connectionNode1 = connectionNode2
-			connectionNode2 = connectionNode1Temp
-		
-		#connection vars;
-		SPNLPpy_syntacticalGraphOperations.createGraphConnectionAG(connectionNode1, connectionNode2)
+		connectionNode1, connectionNode2 = createConnection(connectionNode1, connectionNode2, maxConnectionMetric)
+		acyclicGraphComponents.connectComponents(connectionNode1, connectionNode2)
 
-		numberOfTracedNodesFound = traceGraphACcountSizeWrapper(connectionNode1)
+		numberOfTracedNodesFound = acyclicGraphComponents.getComponentSize(connectionNode1)
 		if(numberOfTracedNodesFound == len(sentenceLeafNodeList)):
 			headNodeFound = True
-			connectionNode1.graphNodeType = graphNodeTypeHead	#reference set delimiter (captures primary subject/action/object of sentence clause)
-			graphHeadNode = connectionNode1
-			
-			createDependencyTreeFromAG(graphHeadNode, 0)
-			
-		
+			graphHeadNode = createDependencyTree(connectionNode1)
+	
+	return graphHeadNode
+
+def generateSyntacticalTreeAcyclicMatrix(sentenceLeafNodeList, sentenceTreeNodeList, connectivityStackNodeList, currentTime, connectionMetricParameterLists):
+	#connection metric matrices (proximity, frequency, recency, metric) of connectivity stack nodes are calculated once; connections between nodes of the same acyclic graph component (cyclic) are permanently masked after every connection
+	#equal metrics are resolved by connectivity stack order (consistent with generateSyntacticalTreeAcyclicStack)
+	connectionMetricMatrices = SPNLPpy_syntacticalGraphOperations.calculateMetricConnectionMatrix(connectivityStackNodeList, connectivityStackNodeList, currentTime)
+	metricMatrix = connectionMetricMatrices[-1]
+	numberOfStackNodes = len(connectivityStackNodeList)
+	connectionValidMatrix = np.logical_not(np.eye(numberOfStackNodes, dtype=bool))
 	if(calibrateConnectionMetricParameters):
-		proximityMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(proximityList)
-		frequencyMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(frequencyList)
-		recencyMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(recencyList)
-		metricMinMeanMax = SPNLPpy_syntacticalGraphOperations.minMeanMaxList(metricList)
-		print("proximityMinMeanMax = ", proximityMinMeanMax)
-		print("frequencyMinMeanMax = ", frequencyMinMeanMax)
-		print("recencyMinMeanMax = ", recencyMinMeanMax)
-		print("metricMinMeanMax = ", metricMinMeanMax)
-			
+		for connectionMetricParameterList, connectionMetricParameterMatrix in zip(connectionMetricParameterLists, connectionMetricMatrices):
+			connectionMetricParameterList.extend(connectionMetricParameterMatrix[connectionValidMatrix].tolist())	#metrics are constant (calibration statistics are not affected by number of connections)
+	connectionAcyclicMatrix = connectionValidMatrix	#connections that would not be cyclic
+	connectionCandidateMatrix = np.logical_and(connectionAcyclicMatrix, np.logical_and(metricMatrix > SPNLPpy_syntacticalGraphOperations.metricThresholdToCreateConnection, metricMatrix > 0.0))
+	acyclicGraphComponents = AcyclicGraphComponents(connectivityStackNodeList)
+	stackIndexDict = {node: stackIndex for stackIndex, node in enumerate(connectivityStackNodeList)}
+	
+	headNodeFound = False
+	graphHeadNode = None
+	while not headNodeFound:
+		if(not np.any(connectionCandidateMatrix)):
+			maxConnectionMetric = 0.0
+			if(np.any(connectionAcyclicMatrix)):
+				maxConnectionMetric = np.max(metricMatrix[connectionAcyclicMatrix])	#best acyclic connection metric
+			print("generateSyntacticalTreeDependencyParserWordVectorsAcyclic: error connectionFound - check calculateMetricConnection parameters > 0.0, maxConnectionMetric = ", maxConnectionMetric)
+			exit()
+		node1StackIndex, node2StackIndex = np.unravel_index(np.argmax(np.where(connectionCandidateMatrix, metricMatrix, -np.inf)), metricMatrix.shape)	#first maximum (row major order)
+		maxConnectionMetric = metricMatrix[node1StackIndex, node2StackIndex]
+		connectionNode1 = connectivityStackNodeList[node1StackIndex]
+		connectionNode2 = connectivityStackNodeList[node2StackIndex]
+		
+		component1StackIndexList = [stackIndexDict[node] for node in acyclicGraphComponents.getComponentNodeList(connectionNode1)]
+		component2StackIndexList = [stackIndexDict[node] for node in acyclicGraphComponents.getComponentNodeList(connectionNode2)]
+		for connectionMaskMatrix in (connectionAcyclicMatrix, connectionCandidateMatrix):
+			connectionMaskMatrix[np.ix_(component1StackIndexList, component2StackIndexList)] = False	#connections between nodes of the connected components would be cyclic
+			connectionMaskMatrix[np.ix_(component2StackIndexList, component1StackIndexList)] = False
+		acyclicGraphComponents.connectComponents(connectionNode1, connectionNode2)
+
+		connectionNode1, connectionNode2 = createConnection(connectionNode1, connectionNode2, maxConnectionMetric)
+
+		if(acyclicGraphComponents.getComponentSize(connectionNode1) == len(sentenceLeafNodeList)):
+			headNodeFound = True
+			graphHeadNode = createDependencyTree(connectionNode1)
+	
 	return graphHeadNode
 
+def createConnection(connectionNode1, connectionNode2, maxConnectionMetric):
+	if(printVerbose):
+		print("create connection; w1 w2 = ", connectionNode1.w, " ", connectionNode2.w, ", connectionNode1.lemma connectionNode2.lemma = ", connectionNode1.lemma, " ", connectionNode2.lemma, ", metric = ", maxConnectionMetric)
+	
+	if(connectionNode1ToNode2):
+		connectionNode1Temp = connectionNode1
+		connectionNode1 = connectionNode2
+		connectionNode2 = connectionNode1Temp
+	
+	#connection vars;
+	SPNLPpy_syntacticalGraphOperations.createGraphConnectionAG(connectionNode1, connectionNode2)
+	
+	return connectionNode1, connectionNode2
 
-def traceGraphACcountSizeWrapper(node1):
-	numberOfTracedNodesFound = 0
-	numberOfTracedNodesFound = traceGraphACcountSize(node1, numberOfTracedNodesFound)
-	return numberOfTracedNodesFound
+def createDependencyTree(graphHeadNode):
+	graphHeadNode.graphNodeType = graphNodeTypeHead	#reference set delimiter (captures primary subject/action/object of sentence clause)
+	createDependencyTreeFromAG(graphHeadNode, 0)
+	return graphHeadNode
 
-def traceGraphIsCyclicWrapper(node1, node2):
-	return targetNodeExistsInSubgraph(node1, node2)	#connectionBetweenNodesExist
 
-def targetNodeExistsInSubgraph(currentNode, targetNode):
-	isCyclic = False
-	if(currentNode == targetNode):
-		isCyclic = True
-	else:
-		if(not currentNode.AGtraced):
-			currentNode.AGtraced = True
-			for connectionTarget in currentNode.AGconnectionList:
-				if(targetNodeExistsInSubgraph(connectionTarget, targetNode)):
-					isCyclic = True
-			currentNode.AGtraced = False
-	return isCyclic
-			
-def traceGraphACcountSize(currentNode, numberOfTracedNodesFound):
-	if(not currentNode.AGtraced):
-		currentNode.AGtraced = True
-		numberOfTracedNodesFound += 1
-		for connectionTarget in currentNode.AGconnectionList:
-			numberOfTracedNodesFound = traceGraphACcountSize(connectionTarget, numberOfTracedNodesFound)
-		currentNode.AGtraced = False
-	return numberOfTracedNodesFound
+class AcyclicGraphComponents:
+	#disjoint set of acyclic graph nodes (union by size, path compression); tracks connectivity, size and nodes of acyclic graph components
+	__slots__ = ("parentNodeDict", "componentNodeListDict")
+	def __init__(self, nodeList):
+		self.parentNodeDict = {}	#dict indexed by node, every entry is parent node (component root nodes are their own parent)
+		self.componentNodeListDict = {}	#dict indexed by component root node, every entry is the list of nodes in component
+		for node in nodeList:
+			self.parentNodeDict[node] = node
+			self.componentNodeListDict[node] = [node]
+	def findComponentRoot(self, node):
+		rootNode = node
+		while(self.parentNodeDict[rootNode] is not rootNode):
+			rootNode = self.parentNodeDict[rootNode]
+		while(node is not rootNode):
+			parentNode = self.parentNodeDict[node]
+			self.parentNodeDict[node] = rootNode
+			node = parentNode
+		return rootNode
+	def isConnected(self, node1, node2):
+		#connection between node1 and node2 would be cyclic
+		return (self.findComponentRoot(node1) is self.findComponentRoot(node2))
+	def connectComponents(self, node1, node2):
+		rootNode1 = self.findComponentRoot(node1)
+		rootNode2 = self.findComponentRoot(node2)
+		if(rootNode1 is not rootNode2):
+			if(len(self.componentNodeListDict[rootNode1]) < len(self.componentNodeListDict[rootNode2])):
+				rootNode1, rootNode2 = rootNode2, rootNode1
+			self.parentNodeDict[rootNode2] = rootNode1
+			self.componentNodeListDict[rootNode1].extend(self.componentNodeListDict.pop(rootNode2))	#smaller component is appended (O(n log n) total)
+	def getComponentSize(self, node):
+		return len(self.componentNodeListDict[self.findComponentRoot(node)])
+	def getComponentNodeList(self, node):
+		return self.componentNodeListDict[self.findComponentRoot(node)]
 
 def connectionExists(node1, node2):
 	result = False
@@ -155,13 +225,17 @@ def connectionExists(node1, node2):
 		result = True
 	return result	
 
-def createDependencyTreeFromAG(currentNode, level):
-	if(not currentNode.AGtraced):
-		currentNode.AGtraced = True
+def createDependencyTreeFromAG(graphHeadNode, level):
+	#iterative depth first traversal of acyclic graph (connections are created in AGconnectionList order)
+	nodeStack = [(graphHeadNode, None, level)]
+	while(len(nodeStack) > 0):
+		currentNode, governorNode, level = nodeStack.pop()
+		dependentNodeList = []
 		for connectionTarget in currentNode.AGconnectionList: 
 			#print("connectionTarget = ", connectionTarget.word)
-			if(not connectionTarget.AGtraced):
+			if(connectionTarget is not governorNode):	#acyclic graph: governorNode is the only traced node connected to currentNode
 				SPNLPpy_syntacticalGraphOperations.createGraphConnectionDP(currentNode, connectionTarget)
-			createDependencyTreeFromAG(connectionTarget, level+1)
+				dependentNodeList.append(connectionTarget)
 		currentNode.DPtreeLevel = level
-		currentNode.AGtraced = False
+		for dependentNode in reversed(dependentNodeList):
+			nodeStack.append((dependentNode, currentNode, level+1))
@@ -18,8 +18,11 @@ SPNLP Syntactical Graph Operations - common operations
 """
 
 import numpy as np
+import bisect
+from collections import Counter
 import ANNtf2_loadDataset
 from SPNLPpy_syntacticalNodeClass import *
+import SPNLPpy_syntacticalNodeStore
 
 printVerbose = False
 
@@ -34,15 +37,23 @@ if(calculateReferenceFrequencyUsingWordVectorSimilarity):
 else:
 	calculateReferenceFrequencyBasedOnNodeSentenceSubgraphsDynamic = True	#mandatory
 calculateReferenceRecencyBasedOnNodeSentenceSubgraphsDynamic = False	#mandatory
+calculateSubgraphNumberIdenticalConceptsMultiset = True	#optional	#calculate number of identical concepts by intersection of subgraph lemma multisets (with sentence node set membership), else nested recursion over subgraphs
 
 calculateFrequencyBasedOnNodeSentenceSubgraphsDynamicEmulate = True	#optional - branch wordVector calculated based on average of leafNode wordVectors, else average of previous branch wordVectors
 calculateRecencyBasedOnNodeSentenceSubgraphsDynamicEmulate = True	#optional - branch conceptTime calculated based on average of leafNode conceptTime, else average of previous branch conceptTimes
 
+identifyBranchReferenceBatch = True	#optional	#calculate reference frequency of candidate instances in vectorised operations (compareWordVectorsBatch; all candidate instances, or batches of identifyBranchReferenceBoundBatchSize candidate instances if identifyBranchReferenceBound) (requires calculateReferenceFrequencyUsingWordVectorSimilarity and !calculateReference*BasedOnNodeSentenceSubgraphsDynamic)
+identifyBranchReferenceBound = True	#optional	#compare candidate instances in order of decreasing recency, terminating when maxFrequencyReference*recency cannot exceed metricThresholdToCreateReference/maxReferenceMetric (requires calculateReferenceFrequencyUsingWordVectorSimilarity and !calculateReference*BasedOnNodeSentenceSubgraphsDynamic)
+identifyBranchReferenceBoundBatchSize = 16	#number of candidate instances compared per vectorised operation	#if(identifyBranchReferenceBound and identifyBranchReferenceBatch)
+maxFrequencyReference = 1.0	#maximum calculateWordVectorSimilarity (wordVectorDiff >= 0)
+calculateMetricConnectionMatrices = True	#optional	#calculate connection metrics of all sentence node pairs with numpy broadcasting (word vector dependency parsers; requires calculateConnectionFrequencyUsingWordVectorSimilarity and !calculateConnection*BasedOnNodeSentenceSubgraphsDynamic)
+
 conceptID = 0	#special instance ID for concepts
 maxTimeDiff = 10.0	#calculateTimeDiff(minRecency)	#CHECKTHIS: requires calibration (<= ~10: ensures timeDiff for unencountered concepts is not infinite - required for metric)	#units: sentenceIndex
 #minRecency = calculateRecency(maxTimeDiff)	#  minRecency = 0.1	#CHECKTHIS: requires calibration (> 0: ensures recency for unencountered concepts is not zero - required for metric)	
 maxRecency = 1.0
 maxTimeDiffForMatchingInstance = 2	#time in sentence index diff	#CHECKTHIS: requires calibration
+identifyInstanceTemporalWindow = False	#optional	#only consider instances with activationTime within maxTimeDiffForMatchingInstance of currentTime (hot instances) for references and most recent instance lookups; bounds per sentence cost independent of corpus length	#identifyBranchReferenceBound is not applied (its index contains all instances)
 metricThresholdToCreateConnection = 0.0	#CHECKTHIS: requires calibration
 metricThresholdToCreateReference = 1.0	#CHECKTHIS: requires calibration
 
@@ -53,8 +64,71 @@ def setParserType(useDependencyParseTreeTemp):
 
 #node:
 
+class SyntacticalConceptInstanceDictionary(dict):
+	#dict indexed by instanceID, every entry is a SyntacticalNode instance; records next instanceID of concept (monotonic; instanceIDs of instances removed from the dictionary are not reused)
+	#maintains recency indices of instances (instances are indexed by activationTime and branch concept time on insertion; an instance must be removed from the dictionary before its activationTime or conceptTime is modified)
+	__slots__ = ("nextInstanceID", "activationTimeList", "activationTimeInstanceDictionary", "branchConceptTimeList")
+	def __init__(self):
+		super().__init__()
+		self.nextInstanceID = 0
+		self.activationTimeList = []	#sorted list of distinct activationTimes of instances
+		self.activationTimeInstanceDictionary = {}	#dict indexed by activationTime, every entry is a dict of SyntacticalNode instances indexed by instanceID (insertion order)
+		self.branchConceptTimeList = []	#sorted list of (getBranchConceptTime, instanceID) of instances	#if(identifyBranchReferenceBound)
+	def __setitem__(self, instanceID, node):
+		if(instanceID in self):
+			self.removeInstanceFromRecencyIndex(instanceID, self[instanceID])
+		super().__setitem__(instanceID, node)
+		self.addInstanceToRecencyIndex(instanceID, node)
+		if(instanceID >= self.nextInstanceID):
+			self.nextInstanceID = instanceID+1
+	def __delitem__(self, instanceID):
+		self.removeInstanceFromRecencyIndex(instanceID, self[instanceID])
+		super().__delitem__(instanceID)
+	def pop(self, instanceID, *default):
+		if(instanceID in self):
+			self.removeInstanceFromRecencyIndex(instanceID, self[instanceID])
+		return super().pop(instanceID, *default)
+	def addInstanceToRecencyIndex(self, instanceID, node):
+		if(node.activationTime not in self.activationTimeInstanceDictionary):
+			bisect.insort(self.activationTimeList, node.activationTime)
+			self.activationTimeInstanceDictionary[node.activationTime] = {}
+		self.activationTimeInstanceDictionary[node.activationTime][instanceID] = node
+		if(identifyBranchReferenceBound):
+			bisect.insort(self.branchConceptTimeList, (getBranchConceptTime(node), instanceID))
+	def removeInstanceFromRecencyIndex(self, instanceID, node):
+		activationTimeInstances = self.activationTimeInstanceDictionary[node.activationTime]
+		del activationTimeInstances[instanceID]
+		if(len(activationTimeInstances) == 0):
+			del self.activationTimeInstanceDictionary[node.activationTime]
+			del self.activationTimeList[bisect.bisect_left(self.activationTimeList, node.activationTime)]
+		if(identifyBranchReferenceBound):
+			del self.branchConceptTimeList[bisect.bisect_left(self.branchConceptTimeList, (getBranchConceptTime(node), instanceID))]
+	def getMostRecentInstance(self, currentTime):
+		#returns instance with latest activationTime (ignoring instances with activationTime == currentTime; first inserted instance if several), or None
+		mostRecentInstanceNode = None
+		if(identifyInstanceTemporalWindow):
+			activationTimeList = self.getTemporalWindowActivationTimes(currentTime)
+		else:
+			activationTimeList = self.activationTimeList[-2:]
+		for activationTime in reversed(activationTimeList):
+			if(activationTime != currentTime):
+				mostRecentInstanceNode = next(iter(self.activationTimeInstanceDictionary[activationTime].values()))
+				break
+		return mostRecentInstanceNode
+	def getTemporalWindowActivationTimes(self, currentTime):
+		#returns sorted list of distinct activationTimes of instances within maxTimeDiffForMatchingInstance of currentTime
+		lowerIndex = bisect.bisect_left(self.activationTimeList, currentTime-maxTimeDiffForMatchingInstance)
+		upperIndex = bisect.bisect_right(self.activationTimeList, currentTime+maxTimeDiffForMatchingInstance)
+		return self.activationTimeList[lowerIndex:upperIndex]
+	def getTemporalWindowInstances(self, currentTime):
+		#returns dict of instances within maxTimeDiffForMatchingInstance of currentTime (hot instances) indexed by instanceID (ordered by instanceID)
+		temporalWindowInstances = {}
+		for activationTime in self.getTemporalWindowActivationTimes(currentTime):
+			temporalWindowInstances.update(self.activationTimeInstanceDictionary[activationTime])
+		return dict(sorted(temporalWindowInstances.items()))
+
 def createSubDictionaryForConcept(dic, lemma):
-	dic[lemma] = {}	#create empty dictionary for new concept
+	dic[lemma] = SyntacticalConceptInstanceDictionary()	#create empty dictionary for new concept
 			
 def findInstanceNodeInGraph(syntacticalGraphNodeDictionary, lemma, instanceID):
 	node = syntacticalGraphNodeDictionary[lemma][instanceID]
@@ -83,11 +157,7 @@ def isInstanceNodeInDictionary(dic, node):
 def getNewInstanceID(syntacticalGraphNodeDictionary, lemma):
 	if lemma in syntacticalGraphNodeDictionary:
 		#newInstanceID = len(syntacticalGraphNodeDictionary[lemma])	#not reliable in the event a sentence node temporarily added to dictionary was referenced and removed from dictionary
-		if(len(syntacticalGraphNodeDictionary[lemma]) > 0):
-			lastInstanceIDadded = list(syntacticalGraphNodeDictionary[lemma])[-1]	#get last element inserted in dictionary (will have highest instanceID) - requires Python 3.7
-			newInstanceID = lastInstanceIDadded+1
-		else:
-			newInstanceID = 0
+		newInstanceID = syntacticalGraphNodeDictionary[lemma].nextInstanceID	#O(1)
 	else:
 		newInstanceID = 0
 	return newInstanceID
@@ -116,6 +186,15 @@ def createGraphConnection(hiddenNode, node1, node2, addToConnectionsDictionary):
 	#	graphConnectionKey = createGraphConnectionKey(hiddenNode, node1, node2)
 	#	syntacticalGraphConnectionsDictionary[graphConnectionKey] = (hiddenNode, node1, node2)
 
+def createGraphConnectionDP(governorNode, dependentNode):
+	addConnectionToNodeDependents(governorNode, dependentNode)
+	addConnectionToNodeGovernors(dependentNode, governorNode)
+
+def createGraphConnectionAG(node1, node2):
+	#undirected acyclic graph connection
+	getNodeScratch(node1).AGconnectionList.append(node2)
+	getNodeScratch(node2).AGconnectionList.append(node1)
+
 #def createGraphConnectionKey(hiddenNode, node1, node2):
 #	connectionKey = (hiddenNode.lemma, hiddenNode.instanceID, node1.lemma, node1.instanceID, node2.lemma, node2.instanceID)
 #	return connectionKey
@@ -135,6 +214,18 @@ def calculateMetricConnection(proximity, frequency, recency):
 	metric = proximity*frequency*recency #CHECKTHIS: requires calibration - normalisation of factors is required
 	#print("\t\tcalculateMetricConnection: metric = ", metric, "; proximity = ", proximity, ", frequency = ", frequency, ", recency = ", recency)
 	return metric
+
+def isCalculateMetricConnectionMatricesSupported():
+	return (calculateMetricConnectionMatrices and calculateConnectionFrequencyUsingWordVectorSimilarity and not calculateConnectionFrequencyBasedOnNodeSentenceSubgraphsDynamic and not calculateConnectionRecencyBasedOnNodeSentenceSubgraphsDynamic)
+	
+def calculateMetricConnectionMatrix(nodeList1, nodeList2, currentTime):
+	#vectorised calculateProximityConnection/calculateFrequencyConnection/calculateRecencyConnection/calculateMetricConnection of every node pair (len(nodeList1) x len(nodeList2)); metrics of identical nodes are undefined
+	proximityMatrix = calculateProximityConnectionBatch(np.array([node.w for node in nodeList1], dtype=float)[:, np.newaxis], np.array([node.w for node in nodeList2], dtype=float)[np.newaxis, :])
+	frequencyMatrix = calculateWordVectorSimilarity(compareWordVectorsMatrix(getBranchWordVectorBatch(nodeList1), getBranchWordVectorBatch(nodeList2)))
+	recencyMatrix = calculateRecencyBatch(compareTime(getBranchConceptTimeBatch(nodeList1)[:, np.newaxis], getBranchConceptTimeBatch(nodeList2)[np.newaxis, :]))
+	metricDataType = (1.0*frequencyMatrix.dtype.type(0)).dtype	#data type of calculateMetricConnection(float, frequency, float)
+	metricMatrix = calculateMetricConnection(proximityMatrix.astype(metricDataType), frequencyMatrix, recencyMatrix.astype(metricDataType))
+	return proximityMatrix, frequencyMatrix, recencyMatrix, metricMatrix
 	
 	
 	
@@ -145,6 +236,12 @@ def calculateProximityConnection(w, w2):
 	#proximity = 1.0	#complete deweight of proximity parameter
 	return proximity
 
+def calculateProximityConnectionBatch(wArray, w2Array):
+	#vectorised calculateProximityConnection (broadcast); proximity of identical w is inf
+	with np.errstate(divide='ignore'):
+		proximityArray = np.divide(1.0, np.absolute(np.subtract(wArray, w2Array)))
+	return proximityArray
+
 
 
 #frequency:
@@ -197,12 +294,19 @@ def compareNodeWordVectors(sentenceTreeNodeList, node1, node2, nodeSentenceSubgr
 	
 def calculateSubgraphArtificialWordVector(sentenceTreeNodeList, node):
 	#CHECKTHIS: requires update - currently uses rudimentary combined word vector similarity comparison
-	subgraphArtificalWordVector = np.zeros(shape=ANNtf2_loadDataset.wordVectorLibraryNumDimensions)
 	if(useDependencyParseTree):
-		subgraphArtificalWordVector, DPsubgraphSize = calculateSubgraphArtificialWordVectorRecurseDP(sentenceTreeNodeList, node, subgraphArtificalWordVector, 0)	
+		if(cacheSubgraphAggregates):
+			subgraphArtificalWordVector, subgraphSize = getSubgraphAggregateDP(node)
+		else:
+			subgraphArtificalWordVector = np.zeros(shape=ANNtf2_loadDataset.wordVectorLibraryNumDimensions)
+			subgraphArtificalWordVector, subgraphSize = calculateSubgraphArtificialWordVectorRecurseDP(sentenceTreeNodeList, node, subgraphArtificalWordVector, 0)	
 	else:
-		subgraphArtificalWordVector, CPsubgraphSize = calculateSubgraphArtificialWordVectorRecurseCP(sentenceTreeNodeList, node, subgraphArtificalWordVector, 0)	
-	subgraphArtificalWordVector = np.divide(subgraphArtificalWordVector, float(CPsubgraphSize))
+		if(cacheSubgraphAggregates):
+			subgraphArtificalWordVector, subgraphSize, _ = getSubgraphAggregateCP(node)
+		else:
+			subgraphArtificalWordVector = np.zeros(shape=ANNtf2_loadDataset.wordVectorLibraryNumDimensions)
+			subgraphArtificalWordVector, subgraphSize = calculateSubgraphArtificialWordVectorRecurseCP(sentenceTreeNodeList, node, subgraphArtificalWordVector, 0)	
+	subgraphArtificalWordVector = np.divide(subgraphArtificalWordVector, float(subgraphSize))
 	return subgraphArtificalWordVector
 
 def calculateSubgraphArtificialWordVectorRecurseDP(sentenceTreeNodeList, node, subgraphArtificalWordVector, DPsubgraphSize):
@@ -256,6 +360,34 @@ def getBranchWordVector(node1):
 		wordVector = np.divide(node1.wordVector)
 	return wordVector
 
+def getBranchWordVectorBatch(nodeList):
+	#returns numpy array (len(nodeList) x wordVector dimensions) of getBranchWordVector of every node in nodeList
+	if(calculateFrequencyBasedOnNodeSentenceSubgraphsDynamicEmulate):
+		conceptWordVectorMatrix = getNodeListColumn(nodeList, "conceptWordVector")
+		subgraphSizeArray = getNodeListColumn(nodeList, "CPsubgraphSize").astype(conceptWordVectorMatrix.dtype)
+		wordVectorMatrix = np.divide(conceptWordVectorMatrix, subgraphSizeArray[:, np.newaxis])
+	else:
+		wordVectorMatrix = getNodeListColumn(nodeList, "wordVector")
+	return wordVectorMatrix
+
+def compareWordVectorsBatch(wordVector1, wordVectorMatrix2):
+	#vectorised compareWordVectors (wordVector1 is compared to every row of wordVectorMatrix2)
+	wordVectorDiffArray = np.mean(np.absolute(np.subtract(wordVectorMatrix2, wordVector1)), axis=1)
+	return wordVectorDiffArray
+
+def compareWordVectorsMatrix(wordVectorMatrix1, wordVectorMatrix2):
+	#vectorised compareWordVectors of every row pair (len(wordVectorMatrix1) x len(wordVectorMatrix2))
+	wordVectorDiffMatrix = np.mean(np.absolute(np.subtract(wordVectorMatrix1[:, np.newaxis, :], wordVectorMatrix2[np.newaxis, :, :])), axis=2)
+	return wordVectorDiffMatrix
+
+def getNodeListColumn(nodeList, attributeName):
+	#returns numpy array of node attribute values
+	if(SPNLPpy_syntacticalNodeStore.useSyntacticalNodeStore):
+		column = SPNLPpy_syntacticalNodeStore.getNodeColumn(attributeName, SPNLPpy_syntacticalNodeStore.getNodeIDArray(nodeList))
+	else:
+		column = np.array([getattr(node, attributeName) for node in nodeList])
+	return column
+
 #frequency metric 2 (identical concept similarity):
 def compareNodeIdenticalConceptSimilarity(sentenceTreeNodeList, node1, node2, nodeSentenceSubgraphsDynamic):
 	if(nodeSentenceSubgraphsDynamic):
@@ -266,9 +398,46 @@ def compareNodeIdenticalConceptSimilarity(sentenceTreeNodeList, node1, node2, no
 	return similarity
 
 def calculateSubgraphNumberIdenticalConcepts(sentenceTreeNodeList, node1, nodeToCompare):
-	numberOfIdenticalConcepts, CPsubgraphSize = calculateSubgraphNumberIdenticalConcepts1(sentenceTreeNodeList, node1, nodeToCompare, 0, 0)
+	if(calculateSubgraphNumberIdenticalConceptsMultiset):
+		sentenceTreeNodeSet = getSentenceTreeNodeSet(sentenceTreeNodeList)
+		lemmaCounter1 = calculateSubgraphLemmaCounter(node1, sentenceTreeNodeSet, True)
+		lemmaCounter2 = calculateSubgraphLemmaCounter(nodeToCompare, sentenceTreeNodeSet, False)
+		numberOfIdenticalConcepts = sum(lemmaCount*lemmaCounter2[lemma] for lemma, lemmaCount in lemmaCounter1.items())	#every node1 subgraph node is compared with every nodeToCompare subgraph node
+		CPsubgraphSize = sum(lemmaCounter1.values())
+	else:
+		numberOfIdenticalConcepts, CPsubgraphSize = calculateSubgraphNumberIdenticalConcepts1(sentenceTreeNodeList, node1, nodeToCompare, 0, 0)
 	similarity = numberOfIdenticalConcepts/CPsubgraphSize
 	return similarity
+
+sentenceTreeNodeSetList = None	#sentenceTreeNodeList of sentenceTreeNodeSet
+sentenceTreeNodeSet = set()
+sentenceTreeNodeSetListLength = 0
+
+def getSentenceTreeNodeSet(sentenceTreeNodeList):
+	#returns set of sentenceTreeNodeList nodes; sentenceTreeNodeList is only appended to during sentence parse, so the set is extended incrementally
+	global sentenceTreeNodeSetList
+	global sentenceTreeNodeSet
+	global sentenceTreeNodeSetListLength
+	if((sentenceTreeNodeList is not sentenceTreeNodeSetList) or (len(sentenceTreeNodeList) < sentenceTreeNodeSetListLength)):
+		sentenceTreeNodeSetList = sentenceTreeNodeList
+		sentenceTreeNodeSet = set()
+		sentenceTreeNodeSetListLength = 0
+	if(len(sentenceTreeNodeList) > sentenceTreeNodeSetListLength):
+		sentenceTreeNodeSet.update(sentenceTreeNodeList[sentenceTreeNodeSetListLength:])
+		sentenceTreeNodeSetListLength = len(sentenceTreeNodeList)
+	return sentenceTreeNodeSet
+
+def calculateSubgraphLemmaCounter(graphHeadNode, sentenceTreeNodeSet, referencedInSentence):
+	#returns lemma multiset of graphHeadNode and its subgraph nodes (sources) that were (referencedInSentence) / were not (!referencedInSentence) referenced in current sentence; equivalent to calculateSubgraphNumberIdenticalConcepts1/2 traversals
+	lemmaCounter = Counter()
+	nodeStack = [graphHeadNode]
+	while(len(nodeStack) > 0):
+		node = nodeStack.pop()
+		lemmaCounter[node.lemma] += 1
+		for subgraphNode in node.CPgraphNodeSourceList:
+			if((subgraphNode in sentenceTreeNodeSet) == referencedInSentence):
+				nodeStack.append(subgraphNode)
+	return lemmaCounter
 	
 #compares all nodes in node1 subgraph (to nodeToCompare subgraphs)
 #recurse node1 subgraph
@@ -328,8 +497,11 @@ def compareNodeConceptTime(sentenceTreeNodeList, node1, node2, currentTime, node
 	return timeDiff
 	
 def calculateSubgraphArtificialTime(sentenceTreeNodeList, node):
-	subgraphArtificalTime = 0
-	subgraphArtificalTime, CPsubgraphSize = calculateSubgraphArtificialTimeRecurse(sentenceTreeNodeList, node, subgraphArtificalTime, 0)
+	if(cacheSubgraphAggregates):
+		_, CPsubgraphSize, subgraphArtificalTime = getSubgraphAggregateCP(node)
+	else:
+		subgraphArtificalTime = 0
+		subgraphArtificalTime, CPsubgraphSize = calculateSubgraphArtificialTimeRecurse(sentenceTreeNodeList, node, subgraphArtificalTime, 0)
 	subgraphArtificalTime = (subgraphArtificalTime / CPsubgraphSize)
 	return subgraphArtificalTime
 
@@ -342,6 +514,65 @@ def calculateSubgraphArtificialTimeRecurse(sentenceTreeNodeList, node, subgraphA
 		subgraphArtificalTime, CPsubgraphSize = calculateSubgraphArtificialTimeRecurse(sentenceTreeNodeList, subgraphNode, subgraphArtificalTime, CPsubgraphSize)
 	return subgraphArtificalTime, CPsubgraphSize
 
+def getSubgraphAggregateCP(graphHeadNode):
+	#returns (wordVectorSum, CPsubgraphSize, conceptTimeSum) of leaf nodes in CP subgraph of graphHeadNode (equivalent to calculateSubgraphArtificial*RecurseCP); aggregates of nodes with sources are cached (see invalidateSubgraphAggregatesCP)
+	subgraphAggregateDict = {}	#dict indexed by node, every entry is the subgraph aggregate of node
+	nodeStack = [(graphHeadNode, False)]
+	while(len(nodeStack) > 0):
+		node, sourceNodesTraced = nodeStack.pop()
+		if(sourceNodesTraced):
+			wordVectorSum = np.zeros(shape=ANNtf2_loadDataset.wordVectorLibraryNumDimensions)
+			CPsubgraphSize = 0
+			conceptTimeSum = 0
+			if(node.graphNodeType == graphNodeTypeLeaf):
+				wordVectorSum += node.wordVector
+				CPsubgraphSize += 1
+				conceptTimeSum += node.conceptTime
+			for sourceNode in node.CPgraphNodeSourceList:
+				sourceWordVectorSum, sourceSubgraphSize, sourceConceptTimeSum = subgraphAggregateDict[sourceNode]
+				wordVectorSum += sourceWordVectorSum
+				CPsubgraphSize += sourceSubgraphSize
+				conceptTimeSum += sourceConceptTimeSum
+			subgraphAggregateDict[node] = (wordVectorSum, CPsubgraphSize, conceptTimeSum)
+			if(len(node.CPgraphNodeSourceList) > 0):
+				node.CPsubgraphAggregate = subgraphAggregateDict[node]
+		elif(node not in subgraphAggregateDict):
+			if(node.CPsubgraphAggregate is not None):
+				subgraphAggregateDict[node] = node.CPsubgraphAggregate
+			else:
+				nodeStack.append((node, True))
+				for sourceNode in node.CPgraphNodeSourceList:
+					if(sourceNode not in subgraphAggregateDict):
+						nodeStack.append((sourceNode, False))
+	return subgraphAggregateDict[graphHeadNode]
+
+def getSubgraphAggregateDP(graphHeadNode):
+	#returns (wordVectorSum, DPsubgraphSize) of nodes in DP subgraph of graphHeadNode (equivalent to calculateSubgraphArtificialWordVectorRecurseDP); aggregates of nodes with dependents are cached (see invalidateSubgraphAggregatesDP)
+	subgraphAggregateDict = {}	#dict indexed by node, every entry is the subgraph aggregate of node
+	nodeStack = [(graphHeadNode, False)]
+	while(len(nodeStack) > 0):
+		node, dependentNodesTraced = nodeStack.pop()
+		if(dependentNodesTraced):
+			wordVectorSum = np.zeros(shape=ANNtf2_loadDataset.wordVectorLibraryNumDimensions)
+			wordVectorSum += node.wordVector
+			DPsubgraphSize = 1
+			for dependentNode in node.DPdependentList:
+				dependentWordVectorSum, dependentSubgraphSize = subgraphAggregateDict[dependentNode]
+				wordVectorSum += dependentWordVectorSum
+				DPsubgraphSize += dependentSubgraphSize
+			subgraphAggregateDict[node] = (wordVectorSum, DPsubgraphSize)
+			if(len(node.DPdependentList) > 0):
+				node.DPsubgraphAggregate = subgraphAggregateDict[node]
+		elif(node not in subgraphAggregateDict):
+			if(node.DPsubgraphAggregate is not None):
+				subgraphAggregateDict[node] = node.DPsubgraphAggregate
+			else:
+				nodeStack.append((node, True))
+				for dependentNode in node.DPdependentList:
+					if(dependentNode not in subgraphAggregateDict):
+						nodeStack.append((dependentNode, False))
+	return subgraphAggregateDict[graphHeadNode]
+
 def getBranchConceptTime(node1):
 	if(calculateRecencyBasedOnNodeSentenceSubgraphsDynamicEmulate):
 		conceptTime = node1.conceptTime/node1.CPsubgraphSize
@@ -349,6 +580,14 @@ def getBranchConceptTime(node1):
 		conceptTime = node1.activationTime	#conceptTime
 	return conceptTime
 
+def getBranchConceptTimeBatch(nodeList):
+	#returns numpy array of getBranchConceptTime of every node in nodeList
+	if(calculateRecencyBasedOnNodeSentenceSubgraphsDynamicEmulate):
+		conceptTimeArray = getNodeListColumn(nodeList, "conceptTime")/getNodeListColumn(nodeList, "CPsubgraphSize")
+	else:
+		conceptTimeArray = getNodeListColumn(nodeList, "activationTime")
+	return conceptTimeArray
+
 def compareTime(time1, time2):
 	timeDiff = abs(time1 - time2)
 	return timeDiff
@@ -378,14 +617,14 @@ def findMostRecentInstance(syntacticalGraphNodeDictionary, sentenceTreeNodeList,
 		instanceDict2 = syntacticalGraphNodeDictionary[lemma]
 		minTimeDiff = maxTimeDiff
 		mostRecentInstanceNode = None
-		for instanceID2, node2 in instanceDict2.items():
-			if(node2.activationTime != currentTime):	#ignore instances that were added from same sentence	#OR: node2 is not in(sentenceTreeNodeList)
-				timeDiff = calculateTimeDiffAbsolute(node2.activationTime, currentTime)
-				#print("timeDiff = ", timeDiff)
-				if(timeDiff < minTimeDiff):
-					foundMostRecentInstanceNode = True
-					minTimeDiff = timeDiff
-					mostRecentInstanceNode = node2	#dict key
+		node2 = instanceDict2.getMostRecentInstance(currentTime)	#O(1) recency index lookup	#ignore instances that were added from same sentence	#OR: node2 is not in(sentenceTreeNodeList)
+		if(node2 is not None):
+			timeDiff = calculateTimeDiffAbsolute(node2.activationTime, currentTime)	#minimum timeDiff of all instances
+			#print("timeDiff = ", timeDiff)
+			if(timeDiff < minTimeDiff):
+				foundMostRecentInstanceNode = True
+				minTimeDiff = timeDiff
+				mostRecentInstanceNode = node2	#dict key
 
 		mostRecentInstanceTimeDiff = minTimeDiff
 	#print("mostRecentInstanceTimeDiff = ", mostRecentInstanceTimeDiff)
@@ -402,6 +641,12 @@ def calculateRecency(timeDiff):
 		recency = 1.0/timeDiff
 	return recency
 
+def calculateRecencyBatch(timeDiffArray):
+	#vectorised calculateRecency
+	recencyArray = np.full(timeDiffArray.shape, maxRecency)
+	np.divide(1.0, timeDiffArray, out=recencyArray, where=(timeDiffArray != 0))
+	return recencyArray
+
 def calculateTimeDiff(recency):
 	timeDiff = 1.0/recency
 	return timeDiff	
@@ -440,33 +685,131 @@ def identifyBranchReference(syntacticalGraphNodeDictionary, sentenceTreeNodeList
 	if(subgraphNode1.lemma in syntacticalGraphNodeDictionary):
 		#print("subgraphNode1.lemma = ", subgraphNode1.lemma)
 		node1ConceptInstances = syntacticalGraphNodeDictionary[subgraphNode1.lemma]	#current limitation: only reference identical lemmas [future allow referencing based on word vector similarity]
-		for instanceID1, instanceNode1 in node1ConceptInstances.items():
-			#print("\tinstanceNode1.activationTime = ", instanceNode1.activationTime)
-			if(instanceNode1.activationTime != currentTime):	#ignore instances that were added from same sentence	#OR: instanceNode1 is not in(sentenceTreeNodeList)
-				frequency = calculateFrequencyReference(sentenceTreeNodeList, subgraphNode1, instanceNode1)
-				recency = calculateRecencyReference(sentenceTreeNodeList, subgraphNode1, instanceNode1, currentTime)
-				referenceMetric = calculateMetricReference(frequency, recency)
-				#print("identifyBranchReference:")
-				#print("\tfrequency = ", frequency)
-				#print("\trecency = ", recency)
-				#print("\treferenceMetric = ", referenceMetric)
-				if(referenceMetric > metricThresholdToCreateReference):
-					if(referenceMetric > maxReferenceMetric):
-						print("identifyBranchReference: foundReference, referenceMetric = ", referenceMetric)
-						print("\tfrequency = ", frequency)
-						print("\trecency = ", recency)
-						maxReferenceMetric = referenceMetric
-						referenceNode = instanceNode1
-						foundReference = True
+		if(identifyInstanceTemporalWindow):
+			node1ConceptInstances = node1ConceptInstances.getTemporalWindowInstances(currentTime)
+		if(identifyBranchReferenceBound and not identifyInstanceTemporalWindow and calculateReferenceFrequencyUsingWordVectorSimilarity and not calculateReferenceFrequencyBasedOnNodeSentenceSubgraphsDynamic and not calculateReferenceRecencyBasedOnNodeSentenceSubgraphsDynamic):
+			foundReference, referenceNode, maxReferenceMetric = identifyBranchReferenceInstancesBound(subgraphNode1, node1ConceptInstances, currentTime, maxReferenceMetric)
+		elif(identifyBranchReferenceBatch and calculateReferenceFrequencyUsingWordVectorSimilarity and not calculateReferenceFrequencyBasedOnNodeSentenceSubgraphsDynamic and not calculateReferenceRecencyBasedOnNodeSentenceSubgraphsDynamic):
+			foundReference, referenceNode, maxReferenceMetric = identifyBranchReferenceInstancesBatch(subgraphNode1, node1ConceptInstances, currentTime, maxReferenceMetric)
+		else:
+			for instanceID1, instanceNode1 in node1ConceptInstances.items():
+				#print("\tinstanceNode1.activationTime = ", instanceNode1.activationTime)
+				if(instanceNode1.activationTime != currentTime):	#ignore instances that were added from same sentence	#OR: instanceNode1 is not in(sentenceTreeNodeList)
+					frequency = calculateFrequencyReference(sentenceTreeNodeList, subgraphNode1, instanceNode1)
+					recency = calculateRecencyReference(sentenceTreeNodeList, subgraphNode1, instanceNode1, currentTime)
+					referenceMetric = calculateMetricReference(frequency, recency)
+					#print("identifyBranchReference:")
+					#print("\tfrequency = ", frequency)
+					#print("\trecency = ", recency)
+					#print("\treferenceMetric = ", referenceMetric)
+					if(referenceMetric > metricThresholdToCreateReference):
+						if(referenceMetric > maxReferenceMetric):
+							print("identifyBranchReference: foundReference, referenceMetric = ", referenceMetric)
+							print("\tfrequency = ", frequency)
+							print("\trecency = ", recency)
+							maxReferenceMetric = referenceMetric
+							referenceNode = instanceNode1
+							foundReference = True
+
+	return foundReference, referenceNode, maxReferenceMetric
+
+def identifyBranchReferenceInstancesBatch(subgraphNode1, node1ConceptInstances, currentTime, maxReferenceMetric):
+	#vectorised equivalent of identifyBranchReference instance comparison loop (calculateFrequencyReference/calculateRecencyReference/calculateMetricReference)
+	foundReference = False
+	referenceNode = None
+	instanceNodeList = [instanceNode1 for instanceNode1 in node1ConceptInstances.values() if (instanceNode1.activationTime != currentTime)]	#ignore instances that were added from same sentence
+	if(len(instanceNodeList) > 0):
+		frequencyArray = calculateWordVectorSimilarity(compareWordVectorsBatch(getBranchWordVector(subgraphNode1), getBranchWordVectorBatch(instanceNodeList)))
+		recencyArray = calculateRecencyBatch(compareTime(getBranchConceptTime(subgraphNode1), getBranchConceptTimeBatch(instanceNodeList)))
+		referenceMetricArray = calculateMetricReference(frequencyArray, recencyArray)
+		referenceIndex = int(np.argmax(referenceMetricArray))	#first instance with max referenceMetric (consistent with sequential comparison)
+		referenceMetric = referenceMetricArray[referenceIndex]
+		if((referenceMetric > metricThresholdToCreateReference) and (referenceMetric > maxReferenceMetric)):
+			print("identifyBranchReference: foundReference, referenceMetric = ", referenceMetric)
+			print("\tfrequency = ", frequencyArray[referenceIndex])
+			print("\trecency = ", recencyArray[referenceIndex])
+			maxReferenceMetric = referenceMetric
+			referenceNode = instanceNodeList[referenceIndex]
+			foundReference = True
+	return foundReference, referenceNode, maxReferenceMetric
+
+
+def identifyBranchReferenceInstancesBound(subgraphNode1, node1ConceptInstances, currentTime, maxReferenceMetric):
+	#equivalent of identifyBranchReference instance comparison loop; candidate instances are compared in order of increasing branch concept timeDiff (node1ConceptInstances.branchConceptTimeList), until recency bound cannot produce a reference
+	#candidate instances are compared in batches (identifyBranchReferenceBatch); the recency bound is tested against maxReferenceMetric of previous batches
+	foundReference = False
+	referenceNode = None
+	candidateNodeList = []
+	candidateTimeDiffList = []
+	if(identifyBranchReferenceBatch):
+		candidateBatchSize = identifyBranchReferenceBoundBatchSize
+	else:
+		candidateBatchSize = 1
+	branchConceptTime1 = getBranchConceptTime(subgraphNode1)
+	branchWordVector1 = getBranchWordVector(subgraphNode1)
+	branchConceptTimeList = node1ConceptInstances.branchConceptTimeList
+	upperIndex = bisect.bisect_left(branchConceptTimeList, (branchConceptTime1,))
+	lowerIndex = upperIndex-1
+	while((lowerIndex >= 0) or (upperIndex < len(branchConceptTimeList))):
+		#select nearest remaining candidate;
+		if(lowerIndex >= 0):
+			timeDiffLower = compareTime(branchConceptTime1, branchConceptTimeList[lowerIndex][0])
+		else:
+			timeDiffLower = float("inf")
+		if(upperIndex < len(branchConceptTimeList)):
+			timeDiffUpper = compareTime(branchConceptTime1, branchConceptTimeList[upperIndex][0])
+		else:
+			timeDiffUpper = float("inf")
+		if(timeDiffLower <= timeDiffUpper):
+			timeDiff = timeDiffLower
+			instanceID1 = branchConceptTimeList[lowerIndex][1]
+			lowerIndex -= 1
+		else:
+			timeDiff = timeDiffUpper
+			instanceID1 = branchConceptTimeList[upperIndex][1]
+			upperIndex += 1
+		
+		if(timeDiff > 0):	#calculateRecency(timeDiff) decreases with timeDiff for timeDiff > 0 (all remaining candidates have recency <= recencyBound)
+			referenceMetricBound = calculateMetricReference(maxFrequencyReference, calculateRecency(timeDiff))
+			if((referenceMetricBound <= metricThresholdToCreateReference) or (referenceMetricBound < maxReferenceMetric)):
+				break
+		
+		instanceNode1 = node1ConceptInstances[instanceID1]
+		if(instanceNode1.activationTime != currentTime):	#ignore instances that were added from same sentence
+			candidateNodeList.append(instanceNode1)
+			candidateTimeDiffList.append(timeDiff)
+			if(len(candidateNodeList) >= candidateBatchSize):
+				foundReference, referenceNode, maxReferenceMetric = compareBranchReferenceCandidates(branchWordVector1, candidateNodeList, candidateTimeDiffList, foundReference, referenceNode, maxReferenceMetric)
+				candidateNodeList = []
+				candidateTimeDiffList = []
+	if(len(candidateNodeList) > 0):
+		foundReference, referenceNode, maxReferenceMetric = compareBranchReferenceCandidates(branchWordVector1, candidateNodeList, candidateTimeDiffList, foundReference, referenceNode, maxReferenceMetric)
+	return foundReference, referenceNode, maxReferenceMetric
 
+def compareBranchReferenceCandidates(branchWordVector1, candidateNodeList, candidateTimeDiffList, foundReference, referenceNode, maxReferenceMetric):
+	#compares candidate instances of identifyBranchReferenceInstancesBound (candidates whose recency bound cannot exceed maxReferenceMetric may be included; they cannot be selected)
+	if(identifyBranchReferenceBatch):
+		frequencyList = calculateWordVectorSimilarity(compareWordVectorsBatch(branchWordVector1, getBranchWordVectorBatch(candidateNodeList)))
+	else:
+		frequencyList = [calculateWordVectorSimilarity(compareWordVectors(branchWordVector1, getBranchWordVector(instanceNode1))) for instanceNode1 in candidateNodeList]
+	for instanceNode1, timeDiff, frequency in zip(candidateNodeList, candidateTimeDiffList, frequencyList):
+		recency = calculateRecency(timeDiff)
+		referenceMetric = calculateMetricReference(frequency, recency)
+		if(referenceMetric > metricThresholdToCreateReference):
+			if((referenceMetric > maxReferenceMetric) or (foundReference and (referenceMetric == maxReferenceMetric) and (instanceNode1.instanceID < referenceNode.instanceID))):	#equal referenceMetric: select first inserted instance (consistent with sequential comparison)
+				print("identifyBranchReference: foundReference, referenceMetric = ", referenceMetric)
+				print("\tfrequency = ", frequency)
+				print("\trecency = ", recency)
+				maxReferenceMetric = referenceMetric
+				referenceNode = instanceNode1
+				foundReference = True
 	return foundReference, referenceNode, maxReferenceMetric
 		
 #replace local branch with referenced graph branch
 def replaceBranch(syntacticalGraphNodeDictionary, branchHeadNode, subgraphNode1, branchReference):
 
-	branchHeadNode.CPgraphNodeSourceList.remove(subgraphNode1)
-	branchHeadNode.CPgraphNodeSourceList.append(branchReference)
-	branchReference.CPgraphNodeTargetList.append(branchHeadNode)
+	replaceConnectionInNodeSources(branchHeadNode, subgraphNode1, branchReference)	#O(1); preserves source position of branch
+	addConnectionToNodeTargets(branchReference, branchHeadNode)
 		
 	#subgraphNode1.CPgraphNodeTargetList.clear()	#not necessary	
 	deleteBranch(syntacticalGraphNodeDictionary, subgraphNode1)
@@ -477,11 +820,38 @@ def deleteBranch(syntacticalGraphNodeDictionary, branchHeadNode):
 		#if(subgraphNode1 in sentenceTreeNodeList):	#verify subgraph instance was referenced in current sentence (should always be true)
 		removeNodeFromGraph(syntacticalGraphNodeDictionary, subgraphNode1)
 		deleteBranch(syntacticalGraphNodeDictionary, subgraphNode1)
+		releaseSyntacticalNode(subgraphNode1)
 		del subgraphNode1
 	
 
 
 
+#tree level:
+
+def calculateNodeTreeLevelSentenceDP(graphHeadNode):
+	#assigns DPtreeLevel (maximum number of DPdependentList connections to a leaf of node subgraph) of all nodes in graphHeadNode subgraph
+	for node, treeLevel in calculateNodeTreeLevels(graphHeadNode, "DPdependentList").items():
+		node.DPtreeLevel = treeLevel
+
+def calculateNodeTreeLevels(graphHeadNode, sourceListName):
+	#iterative post order traversal (O(n); not limited by recursion depth); returns dict indexed by node, every entry is the node tree level
+	treeLevelDict = {}
+	nodeStack = [(graphHeadNode, False)]
+	while(len(nodeStack) > 0):
+		node, sourceNodesTraced = nodeStack.pop()
+		if(sourceNodesTraced):
+			treeLevel = 0
+			for sourceNode in getattr(node, sourceListName):
+				treeLevel = max(treeLevel, treeLevelDict[sourceNode]+1)
+			treeLevelDict[node] = treeLevel
+		elif(node not in treeLevelDict):
+			nodeStack.append((node, True))
+			for sourceNode in getattr(node, sourceListName):
+				if(sourceNode not in treeLevelDict):
+					nodeStack.append((sourceNode, False))
+	return treeLevelDict
+
+
 #python mean:
 
 def mean(lst):
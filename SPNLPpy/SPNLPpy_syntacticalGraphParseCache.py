@@ -0,0 +1,122 @@
+"""SPNLPpy_syntacticalGraphParseCache.py
+
+# Author:
+Richard Bruce Baxter - Copyright (c) 2022-2023 Baxter AI (baxterai.com)
+
+# License:
+MIT License
+
+# Installation:
+see SPNLPpy_main.py
+
+# Usage:
+see SPNLPpy_main.py
+
+# Description:
+SPNLP Syntactical Graph Parse Cache - persistent (on disk) cache of spacy/benepar parse results
+
+- cache entries are keyed by a hash of the sentence text, spacy model name/version, and enabled pipeline components
+- a cache entry stores the serialised spacy doc (tokens, lemmas, POS, heads, dependency labels) and selected doc.user_data entries (eg constituency tree)
+- word vectors are not stored; they are restored by reference from the spacy model vocabulary when the doc is deserialised
+- total cache size is limited to parseCacheMaxSizeBytes (least recently used entries are evicted)
+
+"""
+
+import os
+import pickle
+import hashlib
+from collections import OrderedDict
+import spacy
+from spacy.tokens import Doc
+
+parseCacheFolder = os.path.join(os.path.dirname(__file__), "parseCache")
+parseCacheMaxSizeBytes = 1024*1024*1024	#1GB
+parseCacheFileNameExtension = ".pkl"
+parseCacheFormatVersion = "1"	#increment if cache entry format changes
+parseCacheDocExcludeList = ["user_data", "tensor"]
+
+parseCacheIndex = None	#OrderedDict indexed by cache key, every entry is the size of the cache file (bytes); least recently used entries first
+parseCacheSize = 0
+
+def initialiseParseCache():
+	global parseCacheIndex
+	global parseCacheSize
+	if(parseCacheIndex is None):
+		if not os.path.exists(parseCacheFolder):
+			os.makedirs(parseCacheFolder)
+		parseCacheFileList = []
+		for entry in os.scandir(parseCacheFolder):
+			if(entry.is_file() and entry.name.endswith(parseCacheFileNameExtension)):
+				entryStat = entry.stat()
+				parseCacheKey = entry.name[:-len(parseCacheFileNameExtension)]
+				parseCacheFileList.append((entryStat.st_mtime, parseCacheKey, entryStat.st_size))
+		parseCacheFileList.sort()	#least recently used (oldest modification time) first
+		parseCacheIndex = OrderedDict()
+		parseCacheSize = 0
+		for (modificationTime, parseCacheKey, fileSize) in parseCacheFileList:
+			parseCacheIndex[parseCacheKey] = fileSize
+			parseCacheSize += fileSize
+
+def generateParseCachePipelineIdentifier(spacyModel, disabledComponentList):
+	#identifies spacy model and enabled pipeline components (parse results are dependent on both)
+	enabledComponentList = [componentName for componentName in spacyModel.pipe_names if componentName not in disabledComponentList]
+	pipelineIdentifier = spacyModel.meta.get("lang", "") + "_" + spacyModel.meta.get("name", "") + ":" + spacyModel.meta.get("version", "") + ":" + spacy.__version__ + ":" + ",".join(enabledComponentList) + ":" + parseCacheFormatVersion
+	return pipelineIdentifier
+
+def generateParseCacheKey(sentence, pipelineIdentifier):
+	parseCacheKey = hashlib.sha1((pipelineIdentifier + "\n" + sentence).encode("utf-8")).hexdigest()
+	return parseCacheKey
+
+def generateParseCacheFilePath(parseCacheKey):
+	return os.path.join(parseCacheFolder, parseCacheKey + parseCacheFileNameExtension)
+
+def loadParse(parseCacheKey, spacyModel):
+	initialiseParseCache()
+	doc = None
+	if(parseCacheKey in parseCacheIndex):
+		parseCacheFilePath = generateParseCacheFilePath(parseCacheKey)
+		try:
+			with open(parseCacheFilePath, "rb") as parseCacheFile:
+				parseCacheEntry = pickle.load(parseCacheFile)
+			doc = Doc(spacyModel.vocab).from_bytes(parseCacheEntry["doc"], exclude=parseCacheDocExcludeList)	#word vectors are restored by reference from spacyModel.vocab
+			doc.user_data.update(parseCacheEntry["userData"])
+			os.utime(parseCacheFilePath)	#record last access (least recently used eviction)
+			parseCacheIndex.move_to_end(parseCacheKey)
+		except (OSError, EOFError, pickle.UnpicklingError, KeyError, ValueError):
+			print("SPNLPpy_syntacticalGraphParseCache: loadParse warning: corrupt cache entry ", parseCacheKey)
+			removeParse(parseCacheKey)
+			doc = None
+	return doc
+
+def saveParse(parseCacheKey, doc, userDataKeyList):
+	initialiseParseCache()
+	global parseCacheSize
+	userData = {}
+	for userDataKey in userDataKeyList:
+		if(userDataKey in doc.user_data):
+			userData[userDataKey] = doc.user_data[userDataKey]
+	parseCacheEntry = {"doc": doc.to_bytes(exclude=parseCacheDocExcludeList), "userData": userData}
+	parseCacheFilePath = generateParseCacheFilePath(parseCacheKey)
+	parseCacheFilePathTemp = parseCacheFilePath + ".tmp"
+	with open(parseCacheFilePathTemp, "wb") as parseCacheFile:
+		pickle.dump(parseCacheEntry, parseCacheFile, protocol=pickle.HIGHEST_PROTOCOL)
+	os.replace(parseCacheFilePathTemp, parseCacheFilePath)	#atomic (supports concurrent processes sharing parseCacheFolder)
+	if(parseCacheKey in parseCacheIndex):
+		parseCacheSize -= parseCacheIndex.pop(parseCacheKey)
+	fileSize = os.path.getsize(parseCacheFilePath)
+	parseCacheIndex[parseCacheKey] = fileSize
+	parseCacheSize += fileSize
+	evictParseCache()
+
+def removeParse(parseCacheKey):
+	global parseCacheSize
+	if(parseCacheKey in parseCacheIndex):
+		parseCacheSize -= parseCacheIndex.pop(parseCacheKey)
+	parseCacheFilePath = generateParseCacheFilePath(parseCacheKey)
+	if(os.path.exists(parseCacheFilePath)):
+		os.remove(parseCacheFilePath)
+
+def evictParseCache():
+	while((parseCacheSize > parseCacheMaxSizeBytes) and (len(parseCacheIndex) > 1)):
+		leastRecentlyUsedKey = next(iter(parseCacheIndex))
+		removeParse(leastRecentlyUsedKey)
@@ -18,6 +18,12 @@ SPNLP Syntactical Node Class
 """
 
 import numpy as np
+import itertools
+import bisect
+import SPNLPpy_syntacticalNodeStore
+from SPNLPpy_syntacticalNodeStore import useSyntacticalNodeStore
+
+cacheSubgraphAggregates = True	#optional	#cache CP/DP subgraph aggregates (word vector sum, size, concept time sum) of nodes for SPNLPpy_syntacticalGraphOperations calculateSubgraphArtificial* (invalidated by connection modifications)
 
 graphNodeTypeUnknown = 0
 graphNodeTypeLeaf = 1	#base/input neuron (tree branch leaf)
@@ -33,8 +39,91 @@ graphNodeTargetIndex = 0	#should only contain one element
 graphNodeSourceIndexFirst = 0	#should only contain 2 elements
 graphNodeSourceIndexSecond = 1	#should only contain 2 elements
 
+class SyntacticalNodeScratch:
+	#rarely used temporary/parser specific node state (allocated on first assignment; see syntacticalNodeScratchDefaults)
+	__slots__ = ("CPisPrimarySourceNode", "CPprimaryLeafNode", "CPmultiwordLeafNode", "referenceSetDelimiter", "subreferenceSetDelimiter", "relationshipNodeMoved", "AGconnectionList", "drawn", "CPsubgraphAggregate", "DPsubgraphAggregate")
+	def __init__(self):
+		for name, default in syntacticalNodeScratchDefaults.items():
+			setattr(self, name, default)
+		self.AGconnectionList = []
+	
+syntacticalNodeScratchDefaults = {}	#dict indexed by SyntacticalNodeScratch attribute name, every entry is the value returned for nodes without scratch state
+syntacticalNodeScratchDefaults["CPisPrimarySourceNode"] = False	#temporary for SPNLPpy_syntacticalGraphDependencyParserFromConstituencyParser only
+syntacticalNodeScratchDefaults["CPprimaryLeafNode"] = None	#temporary for SPNLPpy_syntacticalGraphDependencyParserFromConstituencyParser only
+syntacticalNodeScratchDefaults["CPmultiwordLeafNode"] = False	#intermediary var for semantic graph generation
+syntacticalNodeScratchDefaults["referenceSetDelimiter"] = False	#intermediary var for semantic graph generation	#if entityType IsRelationship only
+syntacticalNodeScratchDefaults["subreferenceSetDelimiter"] = False	#intermediary var for semantic graph generation	#if entityType IsRelationship only
+syntacticalNodeScratchDefaults["relationshipNodeMoved"] = False	#intermediary var for semantic graph generation
+syntacticalNodeScratchDefaults["AGconnectionList"] = ()	#temporary for SPNLPpy_syntacticalGraphDependencyParserWordVectorsAcyclic only
+syntacticalNodeScratchDefaults["drawn"] = False	#temporary graph draw variable
+syntacticalNodeScratchDefaults["CPsubgraphAggregate"] = None	#cached (wordVectorSum, CPsubgraphSize, conceptTimeSum) of CP subgraph leaf nodes	#if(cacheSubgraphAggregates)
+syntacticalNodeScratchDefaults["DPsubgraphAggregate"] = None	#cached (wordVectorSum, DPsubgraphSize) of DP subgraph nodes	#if(cacheSubgraphAggregates)
+
+class SyntacticalNodeConnectionList:
+	#ordered multiset of SyntacticalNode connections (list interface); O(1) append/remove/replace/contains, iteration preserves connection order
+	__slots__ = ("connectionDict", "connectionSequenceDict", "nextSequenceIndex")
+	def __init__(self):
+		self.connectionDict = {}	#dict indexed by sequenceIndex, every entry is a SyntacticalNode (insertion order)
+		self.connectionSequenceDict = {}	#dict indexed by SyntacticalNode, every entry is a list of sequenceIndex of its connections (ascending)
+		self.nextSequenceIndex = 0
+	def append(self, node):
+		self.connectionDict[self.nextSequenceIndex] = node
+		self.connectionSequenceDict.setdefault(node, []).append(self.nextSequenceIndex)
+		self.nextSequenceIndex += 1
+	def remove(self, node):
+		#removes first connection to node (consistent with list.remove)
+		sequenceIndex = self.popSequenceIndex(node)
+		del self.connectionDict[sequenceIndex]
+	def removeLast(self, node):
+		#removes last connection to node
+		sequenceIndex = self.popSequenceIndex(node, last=True)
+		del self.connectionDict[sequenceIndex]
+	def replace(self, node, newNode):
+		#replaces first connection to node with connection to newNode (preserves connection position)
+		sequenceIndex = self.popSequenceIndex(node)
+		self.connectionDict[sequenceIndex] = newNode
+		bisect.insort(self.connectionSequenceDict.setdefault(newNode, []), sequenceIndex)
+	def popSequenceIndex(self, node, last=False):
+		if(node not in self.connectionSequenceDict):
+			raise ValueError("SyntacticalNodeConnectionList: node not in connection list")
+		sequenceIndexList = self.connectionSequenceDict[node]
+		if(last):
+			sequenceIndex = sequenceIndexList.pop()
+		else:
+			sequenceIndex = sequenceIndexList.pop(0)
+		if(len(sequenceIndexList) == 0):
+			del self.connectionSequenceDict[node]
+		return sequenceIndex
+	def clear(self):
+		self.connectionDict.clear()
+		self.connectionSequenceDict.clear()
+	def __contains__(self, node):
+		return (node in self.connectionSequenceDict)
+	def __iter__(self):
+		return iter(self.connectionDict.values())
+	def __len__(self):
+		return len(self.connectionDict)
+	def __getitem__(self, index):
+		#O(index); connection lists are accessed by graphNodeTargetIndex/graphNodeSourceIndex* only
+		if(index < 0):
+			index += len(self.connectionDict)
+		if(index < 0 or index >= len(self.connectionDict)):
+			raise IndexError("SyntacticalNodeConnectionList index out of range")
+		return next(itertools.islice(self.connectionDict.values(), index, None))
+
+syntacticalNodeSlots = ("instanceID", "word", "lemma", "posTag", "graphNodeType", "CPlabel", "w", "sentenceIndex", "DPtreeLevel", "CPsourceNodePosition", "entityType", "scratch", "_DPdependencyRelationLabelList", "_CPgraphNodeTargetList", "_CPgraphNodeSourceList", "_DPgovernorList", "_DPdependentList")
+if(useSyntacticalNodeStore):
+	syntacticalNodeSlots = syntacticalNodeSlots + ("nodeID",)	#numeric node state is stored in SPNLPpy_syntacticalNodeStore columns
+else:
+	syntacticalNodeSlots = syntacticalNodeSlots + tuple(SPNLPpy_syntacticalNodeStore.nodeStoreColumnNames)
+
 class SyntacticalNode:
+	#compact layout (__slots__); connection lists (SyntacticalNodeConnectionList) are allocated on first connection, temporary/parser specific state is stored in an optional SyntacticalNodeScratch object
+	__slots__ = syntacticalNodeSlots
 	def __init__(self, instanceID, word, lemma, wordVector, posTag, nodeGraphType, activationTime, CPsubgraphSize, conceptWordVector, conceptTime, w, CPwMin, CPwMax, CPtreeLevel, sentenceIndex):
+		if(useSyntacticalNodeStore):
+			self.nodeID = SPNLPpy_syntacticalNodeStore.addNode()
+			
 		#primary vars;
 		self.instanceID = instanceID
 		self.word = word
@@ -55,54 +144,172 @@ class SyntacticalNode:
 		self.CPtreeLevel = CPtreeLevel	#for constituencyParser
 		self.sentenceIndex = sentenceIndex
 		#self.referenceSentence = False	#temporary flag: node has been reference by current sentence (used for reference resolution only)
-		self.CPisPrimarySourceNode = False #temporary for SPNLPpy_syntacticalGraphConstituencyParserWordVectors only
-		self.CPprimaryLeafNode = None	#temporary for SPNLPpy_syntacticalGraphConstituencyParserWordVectors only
 		self.DPtreeLevel = 0	#for dependencyParser
-		self.DPdependencyRelationLabelList = []	#not used (stored for reference)	#stored in dependents (to governor)	#should only contain one element
+		self._DPdependencyRelationLabelList = None	#not used (stored for reference)	#stored in dependents (to governor)	#should only contain one element
 
-		#connection vars;
-		self.CPgraphNodeTargetList = []	#for constituencyParser	#should only contain one element
-		self.CPgraphNodeSourceList = []	#for constituencyParse
+		#connection vars (lists are allocated on first connection);
+		self._CPgraphNodeTargetList = None	#for constituencyParser	#should only contain one element
+		self._CPgraphNodeSourceList = None	#for constituencyParse
 		#self.CPgraphNodeTargetDict = {}	#dict indexed by lemma, every entry is a dictionary of SyntacticalNode instances indexed by instanceID 	#for optimised lookup by concept
 		#self.CPgraphNodeSourceDict = {}	#dict indexed by lemma, every entry is a dictionary of SyntacticalNode instances indexed by instanceID	#for optimised lookup by concept
 		#self.foundRecentIndex = False	#temporary var (indicates referencing a previously declared instance in the article)
 		self.CPsourceNodePosition = sourceNodePositionUnknown	#for leaf nodes only 
-		self.DPgovernorList = []	#for dependencyParser	#should only contain one element
-		self.DPdependentList = []	#for dependencyParser
+		self._DPgovernorList = None	#for dependencyParser	#should only contain one element
+		self._DPdependentList = None	#for dependencyParser
 		
 		#intermediary vars for semantic graph generation;
 		self.entityType = -1	#temp #GIA_ENTITY_TYPE_UNDEFINED
-		self.CPmultiwordLeafNode = False
-		self.referenceSetDelimiter = False	#if entityType IsRelationship only
-		self.subreferenceSetDelimiter = False	#if entityType IsRelationship only
 		
-		#temporary graph draw variables
-		self.drawn = False
+		#temporary/parser specific vars (see syntacticalNodeScratchDefaults);
+		self.scratch = None
+	
+	#connection lists are read only views (empty tuple) until allocated by addConnectionToNode*;
+	@property
+	def CPgraphNodeTargetList(self):
+		return getNodeConnectionList(self._CPgraphNodeTargetList)
+	@property
+	def CPgraphNodeSourceList(self):
+		return getNodeConnectionList(self._CPgraphNodeSourceList)
+	@property
+	def DPgovernorList(self):
+		return getNodeConnectionList(self._DPgovernorList)
+	@property
+	def DPdependentList(self):
+		return getNodeConnectionList(self._DPdependentList)
+	@property
+	def DPdependencyRelationLabelList(self):
+		return getNodeConnectionList(self._DPdependencyRelationLabelList)
+
+def releaseSyntacticalNode(node):
+	#called when node is removed from graph (node must not be accessed after release)
+	if(useSyntacticalNodeStore):
+		SPNLPpy_syntacticalNodeStore.removeNode(node.nodeID)	#release node store row (and its edges)
+		del node.nodeID
+
+def getNodeConnectionList(connectionList):
+	if(connectionList is None):
+		connectionList = ()
+	return connectionList
+	
+def createSyntacticalNodeScratchProperty(name, default):
+	def getScratchValue(node):
+		if(node.scratch is None):
+			return default
+		return getattr(node.scratch, name)
+	def setScratchValue(node, value):
+		if(node.scratch is None):
+			node.scratch = SyntacticalNodeScratch()
+		setattr(node.scratch, name, value)
+	return property(getScratchValue, setScratchValue)
+
+for syntacticalNodeScratchName, syntacticalNodeScratchDefault in syntacticalNodeScratchDefaults.items():
+	setattr(SyntacticalNode, syntacticalNodeScratchName, createSyntacticalNodeScratchProperty(syntacticalNodeScratchName, syntacticalNodeScratchDefault))
+
+def createSyntacticalNodeStoreProperty(columnName):
+	def getStoreValue(node):
+		return SPNLPpy_syntacticalNodeStore.getNodeValue(node.nodeID, columnName)
+	def setStoreValue(node, value):
+		SPNLPpy_syntacticalNodeStore.setNodeValue(node.nodeID, columnName, value)
+	return property(getStoreValue, setStoreValue)
+
+if(useSyntacticalNodeStore):
+	for nodeStoreColumnName in SPNLPpy_syntacticalNodeStore.nodeStoreColumnNames:
+		setattr(SyntacticalNode, nodeStoreColumnName, createSyntacticalNodeStoreProperty(nodeStoreColumnName))
+
+def getNodeScratch(node):
+	#allocates node scratch state if required (eg for in place modification of AGconnectionList)
+	if(node.scratch is None):
+		node.scratch = SyntacticalNodeScratch()
+	return node.scratch
 		
 def addConnectionToNodeTargets(node, nodeToConnect):
-	node.CPgraphNodeTargetList.append(nodeToConnect)
+	if(node._CPgraphNodeTargetList is None):
+		node._CPgraphNodeTargetList = SyntacticalNodeConnectionList()
+	node._CPgraphNodeTargetList.append(nodeToConnect)
 	#addInstanceNodeToDictionary(node.CPgraphNodeTargetDict, nodeToConnect.lemma, nodeToConnect.instanceID, nodeToConnect)
 
 def addConnectionToNodeSources(node, nodeToConnect):
-	node.CPgraphNodeSourceList.append(nodeToConnect)
+	invalidateSubgraphAggregatesCP(node)
+	if(node._CPgraphNodeSourceList is None):
+		node._CPgraphNodeSourceList = SyntacticalNodeConnectionList()
+	node._CPgraphNodeSourceList.append(nodeToConnect)
+	if(useSyntacticalNodeStore):
+		SPNLPpy_syntacticalNodeStore.addEdge(SPNLPpy_syntacticalNodeStore.edgeTypeCP, nodeToConnect.nodeID, node.nodeID)
 	#addInstanceNodeToDictionary(node.CPgraphNodeSourceDict, nodeToConnect.lemma, nodeToConnect.instanceID, nodeToConnect)
+
+def addConnectionToNodeGovernors(node, nodeToConnect):
+	if(node._DPgovernorList is None):
+		node._DPgovernorList = SyntacticalNodeConnectionList()
+	node._DPgovernorList.append(nodeToConnect)
+
+def addConnectionToNodeDependents(node, nodeToConnect):
+	invalidateSubgraphAggregatesDP(node)
+	if(node._DPdependentList is None):
+		node._DPdependentList = SyntacticalNodeConnectionList()
+	node._DPdependentList.append(nodeToConnect)
+	if(useSyntacticalNodeStore):
+		SPNLPpy_syntacticalNodeStore.addEdge(SPNLPpy_syntacticalNodeStore.edgeTypeDP, nodeToConnect.nodeID, node.nodeID)
+
+def addDependencyRelationLabelToNode(node, dependencyRelationLabel):
+	if(node._DPdependencyRelationLabelList is None):
+		node._DPdependencyRelationLabelList = []
+	node._DPdependencyRelationLabelList.append(dependencyRelationLabel)
+
+def removeConnectionFromNodeSources(node, nodeToDisconnect):
+	invalidateSubgraphAggregatesCP(node)
+	node._CPgraphNodeSourceList.remove(nodeToDisconnect)
+	if(useSyntacticalNodeStore):
+		SPNLPpy_syntacticalNodeStore.removeEdge(SPNLPpy_syntacticalNodeStore.edgeTypeCP, nodeToDisconnect.nodeID, node.nodeID, lastEdge=False)
+
+def replaceConnectionInNodeSources(node, nodeToDisconnect, nodeToConnect):
+	#preserves source position of connection (graphNodeSourceIndexFirst/graphNodeSourceIndexSecond)
+	invalidateSubgraphAggregatesCP(node)
+	node._CPgraphNodeSourceList.replace(nodeToDisconnect, nodeToConnect)
+	if(useSyntacticalNodeStore):
+		SPNLPpy_syntacticalNodeStore.removeEdge(SPNLPpy_syntacticalNodeStore.edgeTypeCP, nodeToDisconnect.nodeID, node.nodeID, lastEdge=False)
+		SPNLPpy_syntacticalNodeStore.addEdge(SPNLPpy_syntacticalNodeStore.edgeTypeCP, nodeToConnect.nodeID, node.nodeID)
 		
 def removeNodeConnections(node1):	
 	removeNodeSourceConnections(node1)
 	removeNodeTargetConnections(node1)
 
 def removeNodeSourceConnections(node1):	
-	for node1sourceIndex, node1source in enumerate(node1.CPgraphNodeSourceList):
-		for node1sourceTargetIndex, node1sourceTarget in enumerate(node1source.CPgraphNodeTargetList):
-			if(node1sourceTarget == node1):
-				node1sourceTargetIndexDel = node1sourceTargetIndex
-		del node1source.CPgraphNodeTargetList[node1sourceTargetIndexDel]
-	node1.CPgraphNodeSourceList.clear()
+	invalidateSubgraphAggregatesCP(node1)
+	for node1source in node1.CPgraphNodeSourceList:
+		node1source._CPgraphNodeTargetList.removeLast(node1)	#removes last connection to node1 (if duplicate connections)
+		if(useSyntacticalNodeStore):
+			SPNLPpy_syntacticalNodeStore.removeEdge(SPNLPpy_syntacticalNodeStore.edgeTypeCP, node1source.nodeID, node1.nodeID, lastEdge=True)
+	node1._CPgraphNodeSourceList = None
 
 def removeNodeTargetConnections(node1):	
-	for node1targetIndex, node1target in enumerate(node1.CPgraphNodeTargetList):
-		for node1targetSourceIndex, node1targetSource in enumerate(node1target.CPgraphNodeSourceList):
-			if(node1targetSource == node1):
-				node1targetSourceIndexDel = node1targetSourceIndex		
-		del node1target.CPgraphNodeSourceList[node1targetSourceIndexDel]
-	node1.CPgraphNodeTargetList.clear()
+	for node1target in node1.CPgraphNodeTargetList:
+		invalidateSubgraphAggregatesCP(node1target)
+		node1target._CPgraphNodeSourceList.removeLast(node1)	#removes last connection to node1 (if duplicate connections)
+		if(useSyntacticalNodeStore):
+			SPNLPpy_syntacticalNodeStore.removeEdge(SPNLPpy_syntacticalNodeStore.edgeTypeCP, node1.nodeID, node1target.nodeID, lastEdge=True)
+	node1._CPgraphNodeTargetList = None
+
+def invalidateSubgraphAggregatesCP(node):
+	#called before modification of node CP sources; invalidates cached CP subgraph aggregates of node and its (recursive) targets
+	#a node with a cached subgraph aggregate has cached source subgraph aggregates (nodes without sources are not cached), so traversal stops at targets without a cached aggregate
+	if(cacheSubgraphAggregates):
+		nodeStack = [node]
+		while(len(nodeStack) > 0):
+			currentNode = nodeStack.pop()
+			if(currentNode.CPsubgraphAggregate is not None):
+				currentNode.CPsubgraphAggregate = None
+				nodeStack.extend(currentNode.CPgraphNodeTargetList)
+			elif(currentNode is node):
+				nodeStack.extend(currentNode.CPgraphNodeTargetList)	#node may not have had sources
+
+def invalidateSubgraphAggregatesDP(node):
+	#called before modification of node DP dependents; invalidates cached DP subgraph aggregates of node and its (recursive) governors
+	if(cacheSubgraphAggregates):
+		nodeStack = [node]
+		while(len(nodeStack) > 0):
+			currentNode = nodeStack.pop()
+			if(currentNode.DPsubgraphAggregate is not None):
+				currentNode.DPsubgraphAggregate = None
+				nodeStack.extend(currentNode.DPgovernorList)
+			elif(currentNode is node):
+				nodeStack.extend(currentNode.DPgovernorList)	#node may not have had dependents
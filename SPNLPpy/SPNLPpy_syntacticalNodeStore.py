@@ -0,0 +1,184 @@
+"""SPNLPpy_syntacticalNodeStore.py
+
+# Author:
+Richard Bruce Baxter - Copyright (c) 2022-2023 Baxter AI (baxterai.com)
+
+# License:
+MIT License
+
+# Installation:
+see SPNLPpy_main.py
+
+# Usage:
+see SPNLPpy_main.py
+
+# Description:
+SPNLP Syntactical Node Store - struct of arrays storage of numeric syntactical node state
+
+- if useSyntacticalNodeStore, every SyntacticalNode is assigned an integer nodeID and its numeric state (wordVector, conceptWordVector, conceptTime, activationTime, CPsubgraphSize, CPtreeLevel, CPwMin, CPwMax) is stored in contiguous numpy columns (SyntacticalNode attributes are properties reading/writing the columns)
+- CP/DP connections are mirrored in edge index arrays (edgeSourceNodeID, edgeTargetNodeID, edgeType, edgeValid)
+- columns are grown geometrically; ids of released nodes (SPNLPpy_syntacticalNodeClass releaseSyntacticalNode) and removed edges are reused
+- vector attributes are returned as copies of the store row (a returned vector is unaffected by subsequent modification of the node or reuse of its row; assign the attribute to modify the node)
+
+"""
+
+import numpy as np
+
+useSyntacticalNodeStore = False	#optional	#store numeric node state in contiguous numpy columns (supports vectorised operations over node sets)
+
+nodeStoreInitialCapacity = 1024
+nodeStoreVectorDataType = np.float32	#spacy word vector data type
+
+nodeStoreVectorColumnNames = ["wordVector", "conceptWordVector"]
+nodeStoreScalarColumnDataTypes = {}	#dict indexed by scalar column name, every entry is the column numpy data type
+nodeStoreScalarColumnDataTypes["conceptTime"] = np.float64
+nodeStoreScalarColumnDataTypes["activationTime"] = np.int64	#units: sentenceIndex
+nodeStoreScalarColumnDataTypes["CPsubgraphSize"] = np.int64
+nodeStoreScalarColumnDataTypes["CPtreeLevel"] = np.int64
+nodeStoreScalarColumnDataTypes["CPwMin"] = np.int64
+nodeStoreScalarColumnDataTypes["CPwMax"] = np.int64
+nodeStoreColumnNames = nodeStoreVectorColumnNames + list(nodeStoreScalarColumnDataTypes.keys())
+
+edgeTypeCP = 0	#constituencyParser connection (source -> target)
+edgeTypeDP = 1	#dependencyParser connection (dependent -> governor)
+
+#node store;
+nodeStoreColumns = {}	#dict indexed by column name, every entry is a numpy array (nodeStoreCapacity rows); vector columns are allocated on first assignment (number of dimensions is determined by the spacy model)
+nodeStoreValid = np.zeros(0, dtype=bool)
+nodeStoreCapacity = 0
+nodeStoreSize = 0	#number of allocated node ids
+nodeStoreFreeIDList = []
+
+#edge store;
+edgeStoreSourceNodeID = np.zeros(0, dtype=np.int64)
+edgeStoreTargetNodeID = np.zeros(0, dtype=np.int64)
+edgeStoreType = np.zeros(0, dtype=np.int8)
+edgeStoreValid = np.zeros(0, dtype=bool)
+edgeStoreCapacity = 0
+edgeStoreSize = 0	#number of allocated edge ids
+edgeStoreFreeIDList = []
+edgeStoreIndex = {}	#dict indexed by (edgeType, sourceNodeID, targetNodeID), every entry is a list of edge ids
+edgeStoreNodeIndex = {}	#dict indexed by nodeID, every entry is a set of edge ids (connections of node)
+
+
+def growColumn(column, capacity):
+	newColumn = np.zeros((capacity,) + column.shape[1:], dtype=column.dtype)
+	newColumn[0:len(column)] = column
+	return newColumn
+
+#node:
+
+def addNode():
+	global nodeStoreSize
+	if(len(nodeStoreFreeIDList) > 0):
+		nodeID = nodeStoreFreeIDList.pop()
+	else:
+		if(nodeStoreSize == nodeStoreCapacity):
+			growNodeStore(max(nodeStoreInitialCapacity, nodeStoreCapacity*2))
+		nodeID = nodeStoreSize
+		nodeStoreSize += 1
+	nodeStoreValid[nodeID] = True
+	return nodeID
+
+def growNodeStore(capacity):
+	global nodeStoreCapacity
+	global nodeStoreValid
+	for columnName, column in nodeStoreColumns.items():
+		nodeStoreColumns[columnName] = growColumn(column, capacity)
+	nodeStoreValid = growColumn(nodeStoreValid, capacity)
+	nodeStoreCapacity = capacity
+
+def removeNode(nodeID):
+	#called when SyntacticalNode is released (removed from graph)
+	nodeStoreValid[nodeID] = False
+	for columnName, column in nodeStoreColumns.items():
+		column[nodeID] = 0
+	if(nodeID in edgeStoreNodeIndex):
+		for edgeID in list(edgeStoreNodeIndex[nodeID]):
+			removeEdgeID(edgeID)
+	nodeStoreFreeIDList.append(nodeID)
+
+def getNodeValue(nodeID, columnName):
+	if(columnName in nodeStoreScalarColumnDataTypes):
+		if(columnName not in nodeStoreColumns):
+			return None
+		value = nodeStoreColumns[columnName][nodeID].item()
+	else:
+		if(columnName not in nodeStoreColumns):
+			return None
+		value = nodeStoreColumns[columnName][nodeID].copy()	#copy (row may be modified or reused after node is released)
+	return value
+
+def setNodeValue(nodeID, columnName, value):
+	if(columnName not in nodeStoreColumns):
+		if(columnName in nodeStoreScalarColumnDataTypes):
+			nodeStoreColumns[columnName] = np.zeros(nodeStoreCapacity, dtype=nodeStoreScalarColumnDataTypes[columnName])
+		else:
+			nodeStoreColumns[columnName] = np.zeros((nodeStoreCapacity, len(value)), dtype=nodeStoreVectorDataType)
+	nodeStoreColumns[columnName][nodeID] = value
+
+def getNodeIDArray(nodeList):
+	return np.fromiter((node.nodeID for node in nodeList), dtype=np.int64, count=len(nodeList))
+
+def getNodeColumn(columnName, nodeIDArray):
+	#returns numpy array of column values of nodes (copy)
+	return nodeStoreColumns[columnName][nodeIDArray]
+
+#edge:
+
+def addEdge(edgeType, sourceNodeID, targetNodeID):
+	global edgeStoreSize
+	if(len(edgeStoreFreeIDList) > 0):
+		edgeID = edgeStoreFreeIDList.pop()
+	else:
+		if(edgeStoreSize == edgeStoreCapacity):
+			growEdgeStore(max(nodeStoreInitialCapacity, edgeStoreCapacity*2))
+		edgeID = edgeStoreSize
+		edgeStoreSize += 1
+	edgeStoreSourceNodeID[edgeID] = sourceNodeID
+	edgeStoreTargetNodeID[edgeID] = targetNodeID
+	edgeStoreType[edgeID] = edgeType
+	edgeStoreValid[edgeID] = True
+	edgeStoreIndex.setdefault((edgeType, sourceNodeID, targetNodeID), []).append(edgeID)
+	edgeStoreNodeIndex.setdefault(sourceNodeID, set()).add(edgeID)
+	edgeStoreNodeIndex.setdefault(targetNodeID, set()).add(edgeID)
+	return edgeID
+
+def growEdgeStore(capacity):
+	global edgeStoreCapacity
+	global edgeStoreSourceNodeID
+	global edgeStoreTargetNodeID
+	global edgeStoreType
+	global edgeStoreValid
+	edgeStoreSourceNodeID = growColumn(edgeStoreSourceNodeID, capacity)
+	edgeStoreTargetNodeID = growColumn(edgeStoreTargetNodeID, capacity)
+	edgeStoreType = growColumn(edgeStoreType, capacity)
+	edgeStoreValid = growColumn(edgeStoreValid, capacity)
+	edgeStoreCapacity = capacity
+
+def removeEdge(edgeType, sourceNodeID, targetNodeID, lastEdge=True):
+	#removes one edge (connection lists may contain duplicate connections); lastEdge: remove last added edge, else first added edge (mirrors SyntacticalNodeConnectionList removeLast/remove)
+	edgeKey = (edgeType, sourceNodeID, targetNodeID)
+	if(edgeKey in edgeStoreIndex):
+		if(lastEdge):
+			removeEdgeID(edgeStoreIndex[edgeKey][-1])
+		else:
+			removeEdgeID(edgeStoreIndex[edgeKey][0])
+
+def removeEdgeID(edgeID):
+	edgeKey = (int(edgeStoreType[edgeID]), int(edgeStoreSourceNodeID[edgeID]), int(edgeStoreTargetNodeID[edgeID]))
+	edgeIDList = edgeStoreIndex[edgeKey]
+	edgeIDList.remove(edgeID)
+	if(len(edgeIDList) == 0):
+		del edgeStoreIndex[edgeKey]
+	for nodeID in set((edgeKey[1], edgeKey[2])):
+		edgeStoreNodeIndex[nodeID].discard(edgeID)
+		if(len(edgeStoreNodeIndex[nodeID]) == 0):
+			del edgeStoreNodeIndex[nodeID]
+	edgeStoreValid[edgeID] = False
+	edgeStoreFreeIDList.append(edgeID)
+
+def getEdges(edgeType):
+	#returns (sourceNodeIDarray, targetNodeIDarray) of all valid edges of edgeType
+	edgeMask = np.logical_and(edgeStoreValid[0:edgeStoreSize], edgeStoreType[0:edgeStoreSize] == edgeType)
+	return edgeStoreSourceNodeID[0:edgeStoreSize][edgeMask], edgeStoreTargetNodeID[0:edgeStoreSize][edgeMask]
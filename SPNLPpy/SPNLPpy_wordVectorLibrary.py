@@ -0,0 +1,101 @@
+"""SPNLPpy_wordVectorLibrary.py
+
+# Author:
+Richard Bruce Baxter - Copyright (c) 2022-2023 Baxter AI (baxterai.com)
+
+# License:
+MIT License
+
+# Installation:
+see SPNLPpy_main.py
+
+# Usage:
+python3 SPNLPpy_wordVectorLibrary.py [export word vector library]
+
+# Description:
+SPNLP word vector library - memory mapped (read only) word vector matrix
+
+- exportWordVectorLibrary exports the spacy model vocabulary vector table to a .npy file (matrix) and a .json file (word to row index)
+- loadWordVectorLibrary memory maps the matrix read only; all worker processes share a single page cache copy of the vector table
+- word vectors returned by getWordVectorLibraryVector are views of the memory mapped matrix (not private copies)
+
+"""
+
+import os
+import json
+import numpy as np
+import SPNLPpy_spacyModelRegistry
+
+useWordVectorLibraryMemoryMap = False	#optional	#retrieve (non-contextual) word vectors from memory mapped word vector library (requires exportWordVectorLibrary)
+
+wordVectorLibraryFolder = os.path.join(os.path.dirname(__file__), "wordVectorLibrary")
+wordVectorLibraryMatrixFileNameExtension = ".npy"
+wordVectorLibraryIndexFileNameExtension = ".json"
+wordVectorLibraryRowUnknown = -1	#out of vocabulary
+
+wordVectorLibraryMatrix = None	#numpy memmap (numberOfRows x wordVectorLibraryNumDimensions)
+wordVectorLibraryIndex = None	#dict indexed by word, every entry is a wordVectorLibraryMatrix row index
+
+def generateWordVectorLibraryFilePaths(modelName):
+	matrixFilePath = os.path.join(wordVectorLibraryFolder, modelName + wordVectorLibraryMatrixFileNameExtension)
+	indexFilePath = os.path.join(wordVectorLibraryFolder, modelName + wordVectorLibraryIndexFileNameExtension)
+	return matrixFilePath, indexFilePath
+
+def exportWordVectorLibrary(modelName=SPNLPpy_spacyModelRegistry.spacyModelNameDefault):
+	spacyModel = SPNLPpy_spacyModelRegistry.getSpacyModel(modelName)
+	vectors = spacyModel.vocab.vectors
+	if not os.path.exists(wordVectorLibraryFolder):
+		os.makedirs(wordVectorLibraryFolder)
+	matrixFilePath, indexFilePath = generateWordVectorLibraryFilePaths(modelName)
+
+	wordVectorMatrix = np.asarray(vectors.data, dtype=np.float32)
+	np.save(matrixFilePath, wordVectorMatrix)
+
+	wordVectorIndex = {}
+	for key, row in vectors.key2row.items():
+		try:
+			word = spacyModel.vocab.strings[key]
+		except KeyError:
+			word = None	#vector key string not stored in vocabulary
+		if(word is not None):
+			wordVectorIndex[word] = int(row)
+	with open(indexFilePath, "w") as indexFile:
+		json.dump(wordVectorIndex, indexFile)
+
+	print("exportWordVectorLibrary: wordVectorMatrix.shape = ", wordVectorMatrix.shape, ", len(wordVectorIndex) = ", len(wordVectorIndex))
+
+def loadWordVectorLibrary(modelName=SPNLPpy_spacyModelRegistry.spacyModelNameDefault):
+	global wordVectorLibraryMatrix
+	global wordVectorLibraryIndex
+	if(wordVectorLibraryMatrix is None):
+		matrixFilePath, indexFilePath = generateWordVectorLibraryFilePaths(modelName)
+		wordVectorLibraryMatrix = np.load(matrixFilePath, mmap_mode='r')	#read only; shared page cache copy across processes
+		with open(indexFilePath, "r") as indexFile:
+			wordVectorLibraryIndex = json.load(indexFile)
+	return wordVectorLibraryMatrix, wordVectorLibraryIndex
+
+def getWordVectorLibraryRow(word):
+	loadWordVectorLibrary()
+	row = wordVectorLibraryIndex.get(word, wordVectorLibraryRowUnknown)
+	return row
+
+def getWordVectorLibraryVector(word):
+	#returns view of memory mapped wordVectorLibraryMatrix row (None if out of vocabulary)
+	row = getWordVectorLibraryRow(word)
+	if(row == wordVectorLibraryRowUnknown):
+		wordVector = None
+	else:
+		wordVector = wordVectorLibraryMatrix[row]
+	return wordVector
+
+def getWordVectorLibraryMatrix(wordList):
+	#returns numpy array of shape (len(wordList), wordVectorLibraryNumDimensions); out of vocabulary words are assigned zero vectors
+	loadWordVectorLibrary()
+	rowArray = np.array([wordVectorLibraryIndex.get(word, wordVectorLibraryRowUnknown) for word in wordList], dtype=np.int64)
+	wordVectorMatrix = np.zeros((len(wordList), wordVectorLibraryMatrix.shape[1]), dtype=wordVectorLibraryMatrix.dtype)
+	wordInVocabulary = (rowArray != wordVectorLibraryRowUnknown)
+	wordVectorMatrix[wordInVocabulary] = wordVectorLibraryMatrix[rowArray[wordInVocabulary]]
+	return wordVectorMatrix
+
+if __name__ == "__main__":
+	exportWordVectorLibrary()